@@ -0,0 +1,157 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "1") == "1"
+
+# Bulk work (job chunks, full-table streams) waits at most this long per chunk for
+# interactive requests to drain, so it still makes progress under steady traffic
+ADMISSION_BULK_YIELD_SECONDS = float(os.getenv("ADMISSION_BULK_YIELD_SECONDS", "1.0"))
+
+# How often a yielding bulk task re-checks the interactive class
+YIELD_CHECK_SECONDS = 0.005
+
+# Long-lived change feed connections mostly sit idle on the event loop, so they are not admitted through a class.
+# Maintenance admin calls stay available under load and don't count as traffic for its quiet-window check
+EXEMPT_PATHS = ("/health", "/orders/changes", "/orders/changes/stream", "/admin/maintenance", "/admin/maintenance/run")
+
+
+class PriorityClass:
+    """
+    Concurrency limit plus a bounded wait queue for one class of requests.
+    Requests beyond the queue cap, or that wait longer than queue_timeout,
+    are rejected straight away instead of piling up on the threadpool.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+    async def acquire(self) -> bool:
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+            self.active += 1
+            return True
+        if self.waiting >= self.max_queue:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self.semaphore.release()
+
+
+def _priority_class(name: str, limit: int, max_queue: int, queue_timeout: float, retry_after: int) -> PriorityClass:
+    """Build a class from its defaults; each can be overridden with ADMISSION_<CLASS>_<SETTING>."""
+    prefix = f"ADMISSION_{name.upper()}_"
+    return PriorityClass(
+        name,
+        limit=int(os.getenv(prefix + "LIMIT", str(limit))),
+        max_queue=int(os.getenv(prefix + "MAX_QUEUE", str(max_queue))),
+        queue_timeout=float(os.getenv(prefix + "QUEUE_TIMEOUT", str(queue_timeout))),
+        retry_after=int(os.getenv(prefix + "RETRY_AFTER", str(retry_after))),
+    )
+
+
+# Interactive reads get most of the threadpool; bulk work is kept to a single
+# slot so it can't starve them or queue up behind the SQLite write lock
+PRIORITY_CLASSES: Dict[str, PriorityClass] = {
+    "interactive": _priority_class("interactive", limit=32, max_queue=128, queue_timeout=2.0, retry_after=1),
+    "write": _priority_class("write", limit=4, max_queue=32, queue_timeout=5.0, retry_after=2),
+    "bulk": _priority_class("bulk", limit=1, max_queue=4, queue_timeout=10.0, retry_after=10),
+}
+
+
+def yield_to_interactive(stop: Optional[threading.Event] = None) -> bool:
+    """
+    Block while interactive requests are running or queued, for at most
+    ADMISSION_BULK_YIELD_SECONDS. Bulk work calls this between chunks so it
+    doesn't compete with them for the GIL and the database. Returns early once
+    stop is set, and whether there was any interactive traffic to wait for.
+    """
+    interactive = PRIORITY_CLASSES["interactive"]
+    busy = False
+    deadline = time.monotonic() + ADMISSION_BULK_YIELD_SECONDS
+    while interactive.active + interactive.waiting and time.monotonic() < deadline:
+        busy = True
+        if stop is not None:
+            if stop.wait(YIELD_CHECK_SECONDS):
+                break
+        else:
+            time.sleep(YIELD_CHECK_SECONDS)
+    return busy
+
+
+def classify(method: str, path: str, query_string: bytes) -> Optional[str]:
+    """Return the priority class for a request, or None if it is not admission controlled."""
+    path = path.rstrip("/") or "/"
+    if method == "OPTIONS" or path in EXEMPT_PATHS:
+        return None
+    if path.startswith("/orders/bulk"):
+        return "bulk"
+    if path.endswith("/batch-get"):
+        # A bounded read of at most BATCH_GET_MAX_IDS records
+        return "interactive"
+    if path == "/items" and method == "GET" and b"limit=" not in query_string:
+        # Unpaginated listing streams the whole table
+        return "bulk"
+    if method in ("GET", "HEAD"):
+        return "interactive"
+    return "write"
+
+
+class AdmissionControlMiddleware:
+    """Applies per-class concurrency limits and sheds load with 503 + Retry-After."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not ADMISSION_CONTROL_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        name = classify(scope["method"], scope["path"], scope.get("query_string", b""))
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        priority_class = PRIORITY_CLASSES[name]
+        if not await priority_class.acquire():
+            response = JSONResponse(
+                {"detail": f"Server busy ({name} requests), retry later"},
+                status_code=503,
+                headers={"Retry-After": str(priority_class.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            priority_class.release()
@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.database import chunked, get_db
+
+# Orders in these statuses are final and can be moved out of the hot table
+ARCHIVE_STATUSES = ("Completed", "Refunded")
+
+# Orders older than this many months (by order_date) are considered cold
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ORDER_ARCHIVE_AFTER_MONTHS", "3"))
+
+# How often the background compaction job runs, and how many rows it moves per transaction
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ORDER_ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "500"))
+
+ORDER_COLUMNS = "id, order_number, customer_name, order_date, status, total_amount, payment_status"
+
+# order_date is stored as free text; both the seed format and ISO dates are in use
+_DATE_FORMATS = ("%d %b %Y", "%Y-%m-%d")
+
+
+def order_month(order_date: str) -> Optional[str]:
+    """Return the YYYY-MM month of an order date, or None if it can't be parsed."""
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(order_date.strip(), fmt).strftime("%Y-%m")
+        except ValueError:
+            continue
+    return None
+
+
+def archive_cutoff_month(today: Optional[date] = None) -> str:
+    """Return the first month that is still hot; anything before it may be archived."""
+    today = today or date.today()
+    months = today.year * 12 + (today.month - 1) - ARCHIVE_AFTER_MONTHS
+    return f"{months // 12:04d}-{months % 12 + 1:02d}"
+
+
+def archive_has_rows(conn: sqlite3.Connection) -> bool:
+    """Check whether any orders have been archived yet."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM orders_archive)")
+    return bool(cursor.fetchone()[0])
+
+
+def needs_archive(conn: sqlite3.Connection, status: Optional[str] = None) -> bool:
+    """
+    Decide whether a query filtered by status has to look at the archive.
+    Only final statuses are ever archived, so e.g. Pending stays on the hot table.
+    """
+    if status is not None and status not in ARCHIVE_STATUSES:
+        return False
+    return archive_has_rows(conn)
+
+
+def archived_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Return archived orders per status, as kept by the orders_archive triggers."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT status, orders FROM orders_archive_counts WHERE orders > 0")
+    return {row["status"]: row["orders"] for row in cursor.fetchall()}
+
+
+def archived_id_range(conn: sqlite3.Connection) -> Tuple[Optional[int], Optional[int]]:
+    """Return the lowest and highest archived order ids (None, None when the archive is empty)."""
+    cursor = conn.cursor()
+    # Separate subqueries so each is a single rowid lookup
+    cursor.execute("SELECT (SELECT MIN(id) FROM orders_archive), (SELECT MAX(id) FROM orders_archive)")
+    return tuple(cursor.fetchone())
+
+
+def orders_source(conn: sqlite3.Connection, status: Optional[str] = None) -> str:
+    """
+    Return the FROM target for an orders query: the hot table alone, or a
+    UNION ALL of hot and archived orders when the filter needs the archive.
+    """
+    if not needs_archive(conn, status):
+        return "orders"
+    return (
+        f"(SELECT {ORDER_COLUMNS} FROM orders"
+        f" UNION ALL SELECT {ORDER_COLUMNS} FROM orders_archive)"
+    )
+
+
+def restore_orders(conn: sqlite3.Connection, order_ids: List[int]) -> int:
+    """
+    Move archived orders back to the hot table so they can be modified.
+    The compaction job archives them again once they are cold.
+    """
+    if not order_ids or not archive_has_rows(conn):
+        return 0
+    cursor = conn.cursor()
+    restored = 0
+    for chunk in chunked(order_ids):
+        placeholders = ", ".join(["?"] * len(chunk))
+        cursor.execute(f"""
+            INSERT INTO orders ({ORDER_COLUMNS})
+            SELECT {ORDER_COLUMNS} FROM orders_archive WHERE id IN ({placeholders})
+        """, chunk)
+        restored += cursor.rowcount
+        cursor.execute(f"DELETE FROM orders_archive WHERE id IN ({placeholders})", chunk)
+    return restored
+
+
+def find_cold_orders(conn: sqlite3.Connection, cutoff_month: str) -> List[int]:
+    """Return the ids of every final order dated before cutoff_month."""
+    cursor = conn.cursor()
+    placeholders = ", ".join(["?"] * len(ARCHIVE_STATUSES))
+    cursor.execute(
+        f"SELECT id, order_date FROM orders WHERE status IN ({placeholders})",
+        ARCHIVE_STATUSES,
+    )
+    cold = []
+    for row in cursor:
+        month = order_month(row["order_date"])
+        if month is not None and month < cutoff_month:
+            cold.append(row["id"])
+    return cold
+
+
+def compact_orders(cutoff_month: Optional[str] = None) -> Dict[str, int]:
+    """
+    Move cold Completed/Refunded orders from orders into orders_archive.
+    Work is committed in batches so the write lock is never held for long.
+    """
+    cutoff_month = cutoff_month or archive_cutoff_month()
+
+    with get_db() as conn:
+        cold = find_cold_orders(conn, cutoff_month)
+
+    moved = 0
+    for start in range(0, len(cold), ARCHIVE_BATCH_SIZE):
+        batch = cold[start:start + ARCHIVE_BATCH_SIZE]
+        with get_db() as conn:
+            cursor = conn.cursor()
+            # Re-check the status inside the transaction in case the order changed meanwhile
+            placeholders = ", ".join(["?"] * len(ARCHIVE_STATUSES))
+            cursor.executemany(f"""
+                INSERT INTO orders_archive ({ORDER_COLUMNS})
+                SELECT {ORDER_COLUMNS} FROM orders
+                WHERE id = ? AND status IN ({placeholders})
+            """, [(order_id, *ARCHIVE_STATUSES) for order_id in batch])
+            cursor.executemany(
+                "DELETE FROM orders WHERE id = ? AND EXISTS (SELECT 1 FROM orders_archive a WHERE a.id = orders.id)",
+                [(order_id,) for order_id in batch],
+            )
+            moved += cursor.rowcount
+
+    return {"archived": moved, "cutoff_month": cutoff_month}
+
+
+class ArchiveCompactor:
+    """Background thread that periodically runs compact_orders()."""
+
+    def __init__(self, interval: int = ARCHIVE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="order-archive-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                compact_orders()
+            except Exception as e:
+                print(f"Order archive compaction failed: {e}")
+            self._stop.wait(self.interval)
+
+
+compactor = ArchiveCompactor()
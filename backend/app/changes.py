@@ -0,0 +1,169 @@
+import asyncio
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from app.database import add_commit_hook, get_db
+
+# Rows kept in order_changes; older entries are pruned and clients behind them must resync
+CHANGE_LOG_RETENTION = int(os.getenv("CHANGE_LOG_RETENTION", "100000"))
+
+# Max buffered events per subscriber; a slower subscriber falls back to reading the log
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("CHANGE_SUBSCRIBER_QUEUE_SIZE", "1000"))
+
+# Rows read per query when replaying or fanning out changes
+CHANGE_BATCH_SIZE = 500
+
+
+# --- Change log ---
+
+def record_change(conn: sqlite3.Connection, op: str, order_id: int, order: Optional[Dict[str, Any]] = None) -> None:
+    """Write one change to the log, in the same transaction as the mutation."""
+    record_changes(conn, op, [(order_id, order)])
+
+
+def record_changes(conn: sqlite3.Connection, op: str, entries: Iterable[tuple]) -> None:
+    """Write (order_id, order) changes to the log; order is None for deletes."""
+    rows = [(order_id, op, json.dumps(order) if order is not None else None) for order_id, order in entries]
+    if not rows:
+        return
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO order_changes (order_id, op, payload) VALUES (?, ?, ?)", rows)
+    # Prune each time the log crosses a multiple of 1000 rather than on every write
+    cursor.execute("SELECT last_insert_rowid()")
+    seq = cursor.fetchone()[0]
+    if CHANGE_LOG_RETENTION and (seq - len(rows)) // 1000 != seq // 1000:
+        cursor.execute("DELETE FROM order_changes WHERE seq <= ?", (seq - CHANGE_LOG_RETENTION,))
+
+
+def latest_seq() -> int:
+    """Return the newest sequence number in the change log."""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM order_changes")
+        return cursor.fetchone()[0]
+
+
+def fetch_changes(since: int, limit: int = CHANGE_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Read changes after `since`.
+    `reset` is set when the log no longer reaches back to `since`, so the client
+    has missed changes and should reload the full list instead of applying deltas.
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT seq, order_id, op, payload, created_at FROM order_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+            (since, limit),
+        )
+        changes = [
+            {
+                "seq": row["seq"],
+                "order_id": row["order_id"],
+                "op": row["op"],
+                "order": json.loads(row["payload"]) if row["payload"] is not None else None,
+                "created_at": row["created_at"],
+            }
+            for row in cursor.fetchall()
+        ]
+        cursor.execute("SELECT MIN(seq), MAX(seq) FROM order_changes")
+        min_seq, max_seq = cursor.fetchone()
+        reset = since > 0 and min_seq is not None and since < min_seq - 1
+        return {
+            "changes": changes,
+            "last_seq": changes[-1]["seq"] if changes else max(since, max_seq or 0),
+            "reset": reset,
+        }
+
+
+# --- Fan-out ---
+
+class Subscription:
+    """A subscriber's bounded event buffer."""
+
+    def __init__(self, since: int):
+        self.since = since
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.lagged = False
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+    def drain(self) -> List[Dict[str, Any]]:
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+
+class ChangeBroker:
+    """
+    Reads new changes once per commit and pushes them to every subscriber.
+    A subscriber whose buffer is full is flagged as lagged instead of blocking
+    the others; it is expected to catch up by reading the log from the database.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_seq = 0
+        self._pending = False
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+        self._last_seq = await run_in_threadpool(latest_seq)
+        add_commit_hook(self.publish)
+
+    def stop(self) -> None:
+        self._loop = None
+        self._subscribers.clear()
+
+    def publish(self) -> None:
+        """Signal that new changes may be available. Safe to call from any thread."""
+        loop = self._loop
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(self._schedule)
+
+    def _schedule(self) -> None:
+        # Coalesce bursts of commits into a single read
+        if not self._pending:
+            self._pending = True
+            asyncio.ensure_future(self._fan_out())
+
+    async def _fan_out(self) -> None:
+        async with self._lock:
+            self._pending = False
+            if not self._subscribers:
+                # Nobody is listening; just move the cursor forward
+                self._last_seq = await run_in_threadpool(latest_seq)
+                return
+            while True:
+                result = await run_in_threadpool(fetch_changes, self._last_seq)
+                for change in result["changes"]:
+                    for sub in list(self._subscribers):
+                        if sub.lagged or change["seq"] <= sub.since:
+                            continue
+                        try:
+                            sub.queue.put_nowait(change)
+                        except asyncio.QueueFull:
+                            sub.lagged = True
+                self._last_seq = result["last_seq"]
+                if len(result["changes"]) < CHANGE_BATCH_SIZE:
+                    break
+
+    def subscribe(self, since: int) -> Subscription:
+        sub = Subscription(since)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+
+broker = ChangeBroker()
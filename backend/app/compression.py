@@ -0,0 +1,272 @@
+import gzip
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Optional codecs; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+
+# Responses smaller than this are sent as is
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Bodies larger than this are compressed on the threadpool instead of the event loop
+COMPRESSION_THREADPOOL_SIZE = int(os.getenv("COMPRESSION_THREADPOOL_SIZE", "65536"))
+
+# Per-codec levels: gzip 1-9, brotli quality 0-11, zstd 1-22
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+# Total compressed bytes kept for repeated GET responses
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+# Event streams are flushed per event and must not be buffered by an encoder
+EXCLUDED_TYPES = ("text/event-stream",)
+
+
+# --- Codecs ---
+
+class _GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so every chunk of a streamed body reaches the client straight away
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# encoding -> (one-shot compress, streaming encoder), in server preference order
+CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[], object]]] = {}
+if zstandard is not None:
+    CODECS["zstd"] = (lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), _ZstdStream)
+if brotli is not None:
+    CODECS["br"] = (lambda data: brotli.compress(data, quality=BROTLI_QUALITY), _BrotliStream)
+CODECS["gzip"] = (lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0), _GzipStream)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the preferred codec the client accepts (honouring q=0), or None for identity."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name] = quality
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in CODECS:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    if content_type.startswith(EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+# --- Cache ---
+
+class CompressedCache:
+    """
+    LRU of compressed bodies keyed by a digest of the uncompressed body, so a
+    repeated identical response is served without recompressing and a changed
+    one can never be served stale.
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> Tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[bytes]:
+        compressed = self._entries.get(key)
+        if compressed is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return compressed
+
+    def put(self, key: Tuple[str, bytes], compressed: bytes) -> None:
+        if len(compressed) > self.max_bytes // 8 or key in self._entries:
+            return
+        self._entries[key] = compressed
+        self.size += len(compressed)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+compressed_cache = CompressedCache()
+
+
+async def compress_body(encoding: str, body: bytes) -> bytes:
+    compress = CODECS[encoding][0]
+    if len(body) > COMPRESSION_THREADPOOL_SIZE:
+        return await run_in_threadpool(compress, body)
+    return compress(body)
+
+
+# --- Middleware ---
+
+class CompressionMiddleware:
+    """
+    Compresses JSON/text responses with the best codec the client accepts
+    (zstd, br or gzip, depending on what is installed). Complete GET bodies
+    are looked up in a compressed-bytes cache; streamed bodies are encoded
+    chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, cacheable=scope["method"] == "GET")
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, cacheable: bool):
+        self._send = send
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self.start: Optional[Message] = None
+        self.active = False
+        self.stream = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if not is_compressible(Headers(raw=message["headers"])):
+                await self._send(message)
+                return
+            # Hold the start message until the first body chunk shows how to encode
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self._begin(start, message)
+            return
+        if not self.active:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if len(body) > COMPRESSION_THREADPOOL_SIZE:
+            chunk = await run_in_threadpool(self.stream.compress, body)
+        else:
+            chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _begin(self, start: Message, message: Message) -> None:
+        headers = MutableHeaders(raw=list(start["headers"]))
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not more_body and len(body) < COMPRESSION_MIN_SIZE:
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+        if more_body:
+            # Streamed response: length is unknown, encode as chunks arrive
+            del headers["Content-Length"]
+            self.active = True
+            self.stream = CODECS[self.encoding][1]()
+            start["headers"] = headers.raw
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": self.stream.compress(body), "more_body": True})
+            return
+
+        if self.cacheable and start["status"] == 200 and "no-store" not in headers.get("cache-control", ""):
+            key = compressed_cache.key(self.encoding, body)
+            compressed = compressed_cache.get(key)
+            if compressed is None:
+                compressed = await compress_body(self.encoding, body)
+                compressed_cache.put(key, compressed)
+        else:
+            compressed = await compress_body(self.encoding, body)
+
+        headers["Content-Length"] = str(len(compressed))
+        start["headers"] = headers.raw
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
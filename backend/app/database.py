@@ -1,22 +1,106 @@
 import os
 import sqlite3
 from contextlib import contextmanager
-from typing import Generator
+from contextvars import ContextVar
+from typing import Callable, Generator, Iterator, List, Optional, Sequence, TypeVar
 
 DATABASE_PATH = os.getenv("DATABASE_PATH", "app.db")
 
+# Max bound parameters per "IN (...)" list, well under SQLite's variable limit
+IN_CHUNK_SIZE = 500
 
-def get_connection() -> sqlite3.Connection:
+# Rows pulled into memory at a time when iterating large result sets
+FETCH_CHUNK_SIZE = 1000
+
+# WAL pages before a commit checkpoints inline. Above SQLite's default (1000) so checkpoints
+# normally run on the maintenance thread instead of inside requests
+WAL_AUTOCHECKPOINT_PAGES = int(os.getenv("WAL_AUTOCHECKPOINT_PAGES", "4096"))
+
+T = TypeVar("T")
+
+# Connection shared by every get_db() call inside shared_transaction()
+_shared_conn: ContextVar[Optional[sqlite3.Connection]] = ContextVar("shared_conn", default=None)
+
+# Callbacks run after a connection from get_db() commits writes
+_commit_hooks: List[Callable[[], None]] = []
+
+
+def get_connection(check_same_thread: bool = True) -> sqlite3.Connection:
     """Create a new database connection."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
+    conn.execute(f"PRAGMA wal_autocheckpoint = {WAL_AUTOCHECKPOINT_PAGES}")
     return conn
 
 
+def chunked(values: Sequence[T], size: int = IN_CHUNK_SIZE) -> Iterator[Sequence[T]]:
+    """Split values into slices small enough for one "IN (...)" query."""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def fetch_chunks(cursor: sqlite3.Cursor, size: int = FETCH_CHUNK_SIZE) -> Iterator[List[sqlite3.Row]]:
+    """Iterate an executed cursor's rows in fetchmany() batches instead of fetchall()."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+
+def add_commit_hook(hook: Callable[[], None]) -> None:
+    """Register a callback to run after a write transaction commits."""
+    if hook not in _commit_hooks:
+        _commit_hooks.append(hook)
+
+
+def _run_commit_hooks() -> None:
+    # The write is already committed, so a failing hook must not fail the request
+    for hook in _commit_hooks:
+        try:
+            hook()
+        except Exception as e:
+            print(f"Commit hook {getattr(hook, '__qualname__', hook)} failed: {e}")
+
+
 @contextmanager
 def get_db() -> Generator[sqlite3.Connection, None, None]:
     """Context manager for database connections."""
+    shared = _shared_conn.get()
+    if shared is not None:
+        # Inside shared_transaction(); the outer block commits or rolls back
+        yield shared
+        return
+    conn = get_connection()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        wrote = conn.total_changes > 0
+        conn.close()
+    if wrote:
+        _run_commit_hooks()
+
+
+def in_shared_transaction() -> bool:
+    """True while inside a shared_transaction() block on this context."""
+    return _shared_conn.get() is not None
+
+
+@contextmanager
+def shared_transaction() -> Generator[sqlite3.Connection, None, None]:
+    """
+    Run every get_db() call made inside this block on one connection, in one
+    transaction that is committed once at the end (or rolled back on error).
+    """
     conn = get_connection()
+    # Take the write lock up front: in WAL mode a transaction that has read can't
+    # upgrade to a writer once another connection has committed, and fails at once
+    conn.execute("BEGIN IMMEDIATE")
+    token = _shared_conn.set(conn)
     try:
         yield conn
         conn.commit()
@@ -24,4 +108,21 @@ def get_db() -> Generator[sqlite3.Connection, None, None]:
         conn.rollback()
         raise
     finally:
+        _shared_conn.reset(token)
+        wrote = conn.total_changes > 0
         conn.close()
+    if wrote:
+        _run_commit_hooks()
+
+
+@contextmanager
+def savepoint(conn: sqlite3.Connection, name: str) -> Generator[None, None, None]:
+    """Nested transaction: changes made in the block are undone if it raises."""
+    conn.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except Exception:
+        conn.execute(f"ROLLBACK TO {name}")
+        conn.execute(f"RELEASE {name}")
+        raise
+    conn.execute(f"RELEASE {name}")
@@ -0,0 +1,248 @@
+"""
+Background jobs for large bulk order operations.
+
+Jobs are rows in the jobs table. A single worker thread (SQLite has one writer
+anyway) processes them a chunk of ids at a time; each chunk and its progress
+update commit together, so a job interrupted by a restart resumes after the
+last committed chunk, and interactive writes get the lock between chunks.
+Bulk routes only queue jobs, so admission control never sees this work;
+instead the worker backs off between chunks while interactive requests are
+running or waiting for a slot, and switches to smaller chunks while they keep
+coming.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.admission import yield_to_interactive
+from app.database import get_db
+
+# Ids handled per transaction; bounds how long each chunk holds the write lock
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "200"))
+
+# Smaller chunks used while interactive requests are in flight, so one that
+# arrives mid-chunk isn't held up for a whole JOB_CHUNK_SIZE transaction
+JOB_BUSY_CHUNK_SIZE = int(os.getenv("JOB_BUSY_CHUNK_SIZE", "50"))
+
+# Pause between chunks so writers waiting on the lock get a turn. SQLite's busy
+# handler retries a locked write up to 100ms apart, so shorter pauses let the
+# worker re-take the lock before a waiting writer wakes up
+JOB_CHUNK_PAUSE_SECONDS = float(os.getenv("JOB_CHUNK_PAUSE_SECONDS", "0.1"))
+
+# Attempts per chunk when the database stays locked past the connection timeout
+JOB_LOCK_RETRIES = 5
+
+# Finished jobs are deleted after this many days
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# kind -> (handler(conn, ids, params) -> affected rows, message template)
+_job_kinds: Dict[str, tuple] = {}
+
+
+def register_job_kind(kind: str, handler: Callable[..., int], message: str) -> None:
+    """
+    Register a chunk handler for a job kind. The message template is
+    formatted with the job params plus `count` (total affected rows).
+    """
+    _job_kinds[kind] = (handler, message)
+
+
+def job_to_dict(row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "kind": row["kind"],
+        "status": row["status"],
+        "total": row["total"],
+        "processed": row["processed"],
+        "affected": row["affected"],
+        "progress": round(row["processed"] / row["total"], 4) if row["total"] else 1.0,
+        "cancel_requested": bool(row["cancel_requested"]),
+        "message": row["message"],
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+    }
+
+
+def submit_job(kind: str, ids: List[int], params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Queue a job over `ids` and wake the worker."""
+    if kind not in _job_kinds:
+        raise ValueError(f"Unknown job kind: {kind}")
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO jobs (kind, params, total) VALUES (?, ?, ?)",
+            (kind, json.dumps({**(params or {}), "ids": list(ids)}), len(ids)),
+        )
+        cursor.execute("SELECT * FROM jobs WHERE id = ?", (cursor.lastrowid,))
+        job = job_to_dict(cursor.fetchone())
+    worker.wake()
+    return job
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        return job_to_dict(row) if row else None
+
+
+def cancel_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Cancel a job. A queued job is cancelled at once; a running one stops
+    before its next chunk (chunks already committed stay applied).
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'queued'
+        """, (job_id,))
+        cursor.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+        cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        return job_to_dict(row) if row else None
+
+
+# --- Worker ---
+
+def _claim_next_job() -> Optional[Dict[str, Any]]:
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, kind, params FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1")
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute(
+            "UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, CURRENT_TIMESTAMP) WHERE id = ?",
+            (row["id"],),
+        )
+        return {"id": row["id"], "kind": row["kind"], "params": json.loads(row["params"])}
+
+
+def _run_chunk(job: Dict[str, Any], chunk_size: int = JOB_CHUNK_SIZE) -> bool:
+    """Process the next chunk of a job in one transaction; return False once the job is finished."""
+    handler, message = _job_kinds[job["kind"]]
+    params = job["params"]
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT processed, affected, cancel_requested FROM jobs WHERE id = ?", (job["id"],))
+        state = cursor.fetchone()
+        if state["cancel_requested"]:
+            cursor.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (job["id"],),
+            )
+            return False
+
+        chunk = params["ids"][state["processed"]:state["processed"] + chunk_size]
+        affected = state["affected"] + (handler(conn, chunk, params) if chunk else 0)
+        processed = state["processed"] + len(chunk)
+        if processed < len(params["ids"]):
+            cursor.execute(
+                "UPDATE jobs SET processed = ?, affected = ? WHERE id = ?",
+                (processed, affected, job["id"]),
+            )
+            return True
+
+        cursor.execute("""
+            UPDATE jobs SET status = 'completed', processed = ?, affected = ?, message = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (processed, affected, message.format(**params, count=affected), job["id"]))
+        return False
+
+
+def _fail_job(job_id: int, error: str) -> None:
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (error, job_id),
+        )
+
+
+def _prune_jobs() -> None:
+    placeholders = ", ".join(["?"] * len(FINISHED_STATUSES))
+    with get_db() as conn:
+        conn.execute(
+            f"DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_at < datetime('now', ?)",
+            (*FINISHED_STATUSES, f"-{JOB_RETENTION_DAYS} days"),
+        )
+
+
+class JobWorker:
+    """Background thread that runs queued jobs one at a time, chunk by chunk."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        # Jobs left running by a previous process resume from their last committed chunk
+        with get_db() as conn:
+            conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+        self._stop.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name="job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(60)
+            self._wake.clear()
+            try:
+                while not self._stop.is_set():
+                    job = _claim_next_job()
+                    if job is None:
+                        break
+                    self._process(job)
+                _prune_jobs()
+            except Exception as e:
+                print(f"Job worker failed: {e}")
+                self._stop.wait(1)
+
+    def _process(self, job: Dict[str, Any]) -> None:
+        retries = 0
+        chunk_size = JOB_CHUNK_SIZE
+        while not self._stop.is_set():
+            try:
+                if not _run_chunk(job, chunk_size):
+                    return
+                retries = 0
+            except sqlite3.OperationalError as e:
+                # The chunk was rolled back; a busy database is worth waiting for
+                retries += 1
+                if "locked" not in str(e) or retries > JOB_LOCK_RETRIES:
+                    _fail_job(job["id"], str(e))
+                    return
+                self._stop.wait(retries)
+                continue
+            except Exception as e:
+                _fail_job(job["id"], str(e))
+                return
+            time.sleep(JOB_CHUNK_PAUSE_SECONDS)
+            chunk_size = JOB_BUSY_CHUNK_SIZE if yield_to_interactive(self._stop) else JOB_CHUNK_SIZE
+        # If stopped mid-job it stays 'running' and is requeued on the next start()
+
+
+worker = JobWorker()
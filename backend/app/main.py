@@ -1,9 +1,44 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routes import health_router, items_router, orders_router
+from app.admission import AdmissionControlMiddleware
+from app.archive import compactor
+from app.changes import broker
+from app.compression import CompressionMiddleware
+from app.jobs import worker as job_worker
+from app.maintenance import maintenance
+from app.order_index import order_index
+from app.routes import admin_router, batch_router, health_router, items_router, jobs_router, orders_router
+from app.suggest import suggest_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start background jobs
+    compactor.start()
+    await broker.start()
+    order_index.start()
+    suggest_index.start()
+    job_worker.start()
+    maintenance.start()
+    yield
+    maintenance.stop()
+    job_worker.stop()
+    suggest_index.stop()
+    order_index.stop()
+    broker.stop()
+    compactor.stop()
+
+
+app = FastAPI(title="Backend Exercise API", version="1.0.0", lifespan=lifespan)
+
+# Compress JSON responses (innermost, so compression CPU counts against the request's admission slot)
+app.add_middleware(CompressionMiddleware)
 
-app = FastAPI(title="Backend Exercise API", version="1.0.0")
+# Per-class concurrency limits and load shedding (added before CORS so CORS wraps its 503s)
+app.add_middleware(AdmissionControlMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -18,6 +53,9 @@ app.add_middleware(
 app.include_router(health_router)
 app.include_router(items_router)
 app.include_router(orders_router)
+app.include_router(batch_router)
+app.include_router(jobs_router)
+app.include_router(admin_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,292 @@
+"""
+Background SQLite maintenance: WAL checkpoints, planner statistics and
+incremental vacuum.
+
+WAL checkpoints are triggered by WAL file size and run at any time (passive
+mode doesn't block writers). Passive checkpoints can't reset the WAL while
+traffic never stops, so past a hard cap it is truncated anyway, with a short
+wait of its own so writers are only held off briefly. ANALYZE and incremental
+vacuum only run in quiet windows, when no admitted requests are in flight and few
+writes have committed recently, and stop once the run's time budget is spent.
+Every run that did something is kept in a short history for the admin endpoint.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from app import database
+from app.admission import PRIORITY_CLASSES
+from app.changes import latest_seq
+
+MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "1") == "1"
+
+# Seconds between maintenance checks
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "30"))
+
+# Wall-clock budget for the quiet-window work of one run
+MAINTENANCE_BUDGET_SECONDS = float(os.getenv("MAINTENANCE_BUDGET_SECONDS", "2.0"))
+
+# A window is quiet when at most this many writes committed in the last MAINTENANCE_QUIET_SECONDS
+MAINTENANCE_QUIET_SECONDS = int(os.getenv("MAINTENANCE_QUIET_SECONDS", "60"))
+MAINTENANCE_QUIET_MAX_WRITES = int(os.getenv("MAINTENANCE_QUIET_MAX_WRITES", "10"))
+
+# WAL size that triggers a checkpoint (passive when busy, truncate when quiet)
+MAINTENANCE_WAL_CHECKPOINT_BYTES = int(os.getenv("MAINTENANCE_WAL_CHECKPOINT_BYTES", str(4 * 1024 * 1024)))
+
+# Past this many times MAINTENANCE_WAL_CHECKPOINT_BYTES the WAL is truncated even when busy,
+# waiting at most this many ms for readers and writers (new writers are held off meanwhile)
+MAINTENANCE_WAL_HARD_CAP_FACTOR = int(os.getenv("MAINTENANCE_WAL_HARD_CAP_FACTOR", "8"))
+MAINTENANCE_WAL_CAP_WAIT_MS = int(os.getenv("MAINTENANCE_WAL_CAP_WAIT_MS", "100"))
+
+# Statistics: ANALYZE at least this often, and sooner after this many order changes
+MAINTENANCE_ANALYZE_SECONDS = int(os.getenv("MAINTENANCE_ANALYZE_SECONDS", "3600"))
+MAINTENANCE_ANALYZE_CHURN = int(os.getenv("MAINTENANCE_ANALYZE_CHURN", "20000"))
+
+# Rows sampled per index by ANALYZE, which bounds how long it takes on large tables
+MAINTENANCE_ANALYSIS_LIMIT = int(os.getenv("MAINTENANCE_ANALYSIS_LIMIT", "1000"))
+
+# Incremental vacuum starts once this many pages are free, and releases this many per step
+MAINTENANCE_VACUUM_MIN_FREE_PAGES = int(os.getenv("MAINTENANCE_VACUUM_MIN_FREE_PAGES", "1024"))
+MAINTENANCE_VACUUM_STEP_PAGES = 256
+
+# Runs kept for the admin endpoint
+MAINTENANCE_HISTORY_SIZE = 100
+
+
+def wal_bytes() -> int:
+    try:
+        return os.path.getsize(database.DATABASE_PATH + "-wal")
+    except OSError:
+        return 0
+
+
+def file_bytes() -> int:
+    try:
+        return os.path.getsize(database.DATABASE_PATH)
+    except OSError:
+        return 0
+
+
+def _pragma(conn: sqlite3.Connection, name: str):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+class MaintenanceService:
+    """
+    Background thread that runs the maintenance tasks.
+    It keeps one idle connection open for its whole lifetime: SQLite
+    checkpoints and deletes the WAL whenever the last connection closes,
+    which would otherwise happen inside whichever request closed it last.
+    """
+
+    def __init__(self, interval: int = MAINTENANCE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=MAINTENANCE_HISTORY_SIZE)
+        self._commits: Deque[float] = deque()
+        self._commits_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_analyze = time.monotonic()
+        self._analyzed_seq: Optional[int] = None
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        if not MAINTENANCE_ENABLED:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        database.add_commit_hook(self._on_commit)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sqlite-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        self._conn = self._connect()
+        # A connection only attaches to the WAL once it has read from the database
+        self._conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    with self._run_lock:
+                        self.history.extend(self._run_tasks(self._conn, force=False))
+                except Exception as e:
+                    print(f"SQLite maintenance failed: {e}")
+        finally:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _connect() -> sqlite3.Connection:
+        conn = database.get_connection()
+        # Autocommit: VACUUM and checkpoints can't run inside a transaction
+        conn.isolation_level = None
+        return conn
+
+    # --- Traffic ---
+
+    def _on_commit(self) -> None:
+        with self._commits_lock:
+            self._commits.append(time.monotonic())
+
+    def recent_writes(self) -> int:
+        cutoff = time.monotonic() - MAINTENANCE_QUIET_SECONDS
+        with self._commits_lock:
+            while self._commits and self._commits[0] < cutoff:
+                self._commits.popleft()
+            return len(self._commits)
+
+    def in_flight(self) -> int:
+        return sum(pc.active + pc.waiting for pc in PRIORITY_CLASSES.values())
+
+    def is_quiet(self) -> bool:
+        return self.in_flight() == 0 and self.recent_writes() <= MAINTENANCE_QUIET_MAX_WRITES
+
+    # --- Runs ---
+
+    def run_now(self) -> List[Dict[str, Any]]:
+        """
+        Run every task straight away, ignoring the quiet-window and due checks
+        (the time budget still applies), and return the runs that did something.
+        """
+        with self._run_lock:
+            conn = self._connect()
+            try:
+                runs = self._run_tasks(conn, force=True)
+            finally:
+                conn.close()
+            self.history.extend(runs)
+            return runs
+
+    def _run_tasks(self, conn: sqlite3.Connection, force: bool) -> List[Dict[str, Any]]:
+        deadline = time.monotonic() + MAINTENANCE_BUDGET_SECONDS
+        quiet = force or self.is_quiet()
+        runs = [self._checkpoint(conn, deadline, quiet, force)]
+        if quiet:
+            runs.append(self._statistics(conn, force))
+            runs.append(self._vacuum(conn, deadline, force))
+        return [run for run in runs if run is not None]
+
+    def _record(self, task: str, trigger: str, started: float, started_at: str, effect: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "task": task,
+            "trigger": trigger,
+            "started_at": started_at,
+            "duration_ms": round((time.monotonic() - started) * 1000, 2),
+            "effect": effect,
+        }
+
+    def _checkpoint(self, conn: sqlite3.Connection, deadline: float, quiet: bool, force: bool) -> Optional[Dict[str, Any]]:
+        size = wal_bytes()
+        if size < MAINTENANCE_WAL_CHECKPOINT_BYTES and not (force and size):
+            return None
+        over_cap = size >= MAINTENANCE_WAL_CHECKPOINT_BYTES * MAINTENANCE_WAL_HARD_CAP_FACTOR
+        # Truncate waits for readers and writers to finish (holding new writers off meanwhile);
+        # only worth it when nobody is around, or once the WAL has grown past the hard cap
+        mode = "TRUNCATE" if quiet or over_cap else "PASSIVE"
+        if force:
+            trigger = "manual"
+        else:
+            trigger = "wal_cap" if over_cap and not quiet else "wal_size"
+        started, started_at = time.monotonic(), datetime.now(timezone.utc).isoformat()
+        busy_timeout = _pragma(conn, "busy_timeout")
+        # The wait for readers and writers comes out of the run's time budget
+        wait_ms = max(int((deadline - started) * 1000), 0)
+        if mode == "TRUNCATE" and not quiet:
+            # Every writer stalls while a busy-time truncate waits; if readers outlast the wait the
+            # WAL is left checkpointed as far as they allow, and the next run tries again
+            wait_ms = min(wait_ms, MAINTENANCE_WAL_CAP_WAIT_MS)
+        conn.execute(f"PRAGMA busy_timeout = {wait_ms}")
+        try:
+            busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+        return self._record(f"wal_checkpoint_{mode.lower()}", trigger, started, started_at, {
+            "wal_bytes_before": size,
+            "wal_bytes_after": wal_bytes(),
+            "frames": log_frames,
+            "frames_checkpointed": checkpointed,
+            "blocked": bool(busy),
+        })
+
+    def _statistics(self, conn: sqlite3.Connection, force: bool) -> Optional[Dict[str, Any]]:
+        seq = latest_seq()
+        if self._analyzed_seq is None:
+            self._analyzed_seq = seq
+        churn = seq - self._analyzed_seq
+        due = time.monotonic() - self._last_analyze >= MAINTENANCE_ANALYZE_SECONDS
+        if not (force or due or churn >= MAINTENANCE_ANALYZE_CHURN):
+            return None
+
+        if force:
+            trigger = "manual"
+        else:
+            trigger = "churn" if churn >= MAINTENANCE_ANALYZE_CHURN else "schedule"
+        started, started_at = time.monotonic(), datetime.now(timezone.utc).isoformat()
+        # Sampled, so its cost stays bounded however large the tables get
+        conn.execute(f"PRAGMA analysis_limit = {MAINTENANCE_ANALYSIS_LIMIT}")
+        conn.execute("ANALYZE")
+        self._analyzed_seq = seq
+        self._last_analyze = time.monotonic()
+        return self._record("analyze", trigger, started, started_at, {
+            "order_changes_since_analyze": churn,
+            "analysis_limit": MAINTENANCE_ANALYSIS_LIMIT,
+        })
+
+    def _vacuum(self, conn: sqlite3.Connection, deadline: float, force: bool) -> Optional[Dict[str, Any]]:
+        if _pragma(conn, "auto_vacuum") != 2:
+            # Needs migration 008 (incremental auto-vacuum)
+            return None
+        free_before = _pragma(conn, "freelist_count")
+        if free_before == 0 or (free_before < MAINTENANCE_VACUUM_MIN_FREE_PAGES and not force):
+            return None
+
+        started, started_at = time.monotonic(), datetime.now(timezone.utc).isoformat()
+        bytes_before = file_bytes()
+        free = free_before
+        # Small steps so each one holds the write lock briefly; stop when traffic picks up
+        while free and time.monotonic() < deadline and (force or self.is_quiet()):
+            conn.execute(f"PRAGMA incremental_vacuum({MAINTENANCE_VACUUM_STEP_PAGES})")
+            free = _pragma(conn, "freelist_count")
+        return self._record("incremental_vacuum", "manual" if force else "free_pages", started, started_at, {
+            "free_pages_before": free_before,
+            "free_pages_after": free,
+            "file_bytes_before": bytes_before,
+            "file_bytes_after": file_bytes(),
+            "budget_exhausted": bool(free) and time.monotonic() >= deadline,
+        })
+
+    # --- Reporting ---
+
+    def status(self) -> Dict[str, Any]:
+        with database.get_db() as conn:
+            return {
+                "enabled": MAINTENANCE_ENABLED,
+                "journal_mode": _pragma(conn, "journal_mode"),
+                "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}[_pragma(conn, "auto_vacuum")],
+                "page_size": _pragma(conn, "page_size"),
+                "page_count": _pragma(conn, "page_count"),
+                "freelist_count": _pragma(conn, "freelist_count"),
+                "file_bytes": file_bytes(),
+                "wal_bytes": wal_bytes(),
+                "quiet": self.is_quiet(),
+                "running": self._thread is not None and self._thread.is_alive(),
+                "in_flight_requests": self.in_flight(),
+                "writes_last_window": self.recent_writes(),
+            }
+
+
+maintenance = MaintenanceService()
@@ -0,0 +1,391 @@
+"""
+Optional in-process columnar mirror of the orders table.
+
+Holds every order (hot and archived) in NumPy arrays, with status and
+payment_status dictionary-encoded and a presorted permutation per sortable
+column, so list_orders can filter, sort, count and page without SQL.
+
+Writes are followed by replaying the order_changes log into a small overlay
+(`delta`) that queries merge with the sorted base arrays; once the overlay
+grows past DELTA_LIMIT rows it is merged into the base. The log is only read
+after a commit hook marks the mirror dirty (or every RECHECK_SECONDS, for
+writes made by other processes), so clean reads never touch SQLite. Until the
+mirror has been built (or after it falls behind the log) `ready` is False and
+callers use SQL.
+
+Enable with ORDER_INDEX_ENABLED=1; requires numpy.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the mirror stays disabled without it
+    np = None
+
+from app.archive import orders_source
+from app.changes import fetch_changes, latest_seq
+from app.database import add_commit_hook, fetch_chunks, get_db
+
+ORDER_INDEX_ENABLED = os.getenv("ORDER_INDEX_ENABLED", "0") == "1"
+
+# Overlay size at which pending changes are merged into the sorted base arrays
+DELTA_LIMIT = int(os.getenv("ORDER_INDEX_DELTA_LIMIT", "2000"))
+
+# Max seconds between change log reads when no commit from this process marked the mirror dirty
+RECHECK_SECONDS = float(os.getenv("ORDER_INDEX_RECHECK_SECONDS", "1"))
+
+# Sortable columns, matching ORDER_SORT_FIELDS in routes/orders.py ("id" is the storage order)
+SORT_FIELDS = ("order_number", "order_date", "total_amount", "payment_status", "customer_name", "status")
+
+# Stored as UTF-8 bytes, which sort the same way as SQLite's default BINARY collation
+TEXT_FIELDS = ("order_number", "customer_name", "order_date")
+
+# Dictionary-encoded columns
+ENCODED_FIELDS = ("status", "payment_status")
+
+ORDER_FIELDS = ("id", "order_number", "customer_name", "order_date", "status", "total_amount", "payment_status")
+
+# First chunk of a permutation scanned for filtered matches; doubles until the page is filled
+SCAN_CHUNK = 8192
+
+
+def _text_array(values: List[str]):
+    return np.array([value.encode() for value in values], dtype=bytes)
+
+
+def _insert(array, at, values):
+    """np.insert that widens fixed-width byte arrays instead of truncating."""
+    if array.dtype.kind == "S" and values.dtype.itemsize > array.dtype.itemsize:
+        array = array.astype(values.dtype)
+    return np.insert(array, at, values)
+
+
+class OrderIndex:
+    """
+    Columnar order mirror. Base rows are stored in id order; perms[field] lists
+    base positions sorted by that field (ties in id order) and keys[field] holds
+    the matching sorted values. `alive` masks base rows shadowed by the overlay.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._dirty = False
+        self._checked = 0.0
+        self.ready = False
+        self.seq = 0
+
+    # --- Building ---
+
+    def start(self) -> None:
+        """Build the mirror in the background; list_orders uses SQL until it is ready."""
+        if not ORDER_INDEX_ENABLED or np is None:
+            return
+        add_commit_hook(self._mark_dirty)
+        self._rebuild_in_background()
+
+    def stop(self) -> None:
+        self.ready = False
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+
+    def _rebuild_in_background(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.rebuild, name="order-index-build", daemon=True)
+        self._thread.start()
+
+    def rebuild(self) -> None:
+        """Load every order from the database and sort all columns."""
+        try:
+            # Take the log position first; changes made while loading are replayed afterwards
+            seq = latest_seq()
+            columns: Dict[str, list] = {name: [] for name in ORDER_FIELDS}
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT * FROM {orders_source(conn)} ORDER BY id")
+                for rows in fetch_chunks(cursor):
+                    for row in rows:
+                        for name, values in columns.items():
+                            values.append(row[name])
+            with self._lock:
+                self._load(columns)
+                self.seq = seq
+                self._catch_up()
+                self._checked = time.monotonic()
+                self.ready = True
+        except Exception as e:
+            self.ready = False
+            print(f"Order index build failed: {e}")
+
+    def _load(self, columns: Dict[str, list]) -> None:
+        self.ids = np.array(columns["id"], dtype=np.int64)
+        self.cols: Dict[str, Any] = {field: _text_array(columns[field]) for field in TEXT_FIELDS}
+        self.cols["total_amount"] = np.array(columns["total_amount"], dtype=np.float64)
+        self.dictionaries: Dict[str, List[str]] = {}
+        self.codes: Dict[str, Dict[str, int]] = {}
+        for field in ENCODED_FIELDS:
+            values = sorted(set(columns[field]))
+            self.dictionaries[field] = values
+            self.codes[field] = {value: code for code, value in enumerate(values)}
+            self.cols[field] = np.array([self.codes[field][value] for value in columns[field]], dtype=np.int16)
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self.delta: Dict[int, Optional[dict]] = {}
+        self._sort_all()
+        self._count_statuses()
+
+    def _sort_keys(self, field: str, positions=None):
+        """Values compared when sorting by field (encoded columns sort by their text)."""
+        values = self.cols[field] if positions is None else self.cols[field][positions]
+        if field in ENCODED_FIELDS:
+            return _text_array(self.dictionaries[field])[values]
+        return values
+
+    def _sort_all(self) -> None:
+        self.perms: Dict[str, Any] = {}
+        self.keys: Dict[str, Any] = {}
+        for field in SORT_FIELDS:
+            values = self._sort_keys(field)
+            # Stable sort over id-ordered rows keeps ties in id order
+            perm = np.argsort(values, kind="stable")
+            self.perms[field] = perm
+            self.keys[field] = values[perm]
+
+    def _count_statuses(self) -> None:
+        codes = self.cols["status"][self.alive]
+        counts = np.bincount(codes, minlength=len(self.dictionaries["status"]))
+        self.status_counts = {value: int(counts[code]) for code, value in enumerate(self.dictionaries["status"])}
+        for order in self.delta.values():
+            if order is not None:
+                self.status_counts[order["status"]] = self.status_counts.get(order["status"], 0) + 1
+
+    # --- Incremental sync ---
+
+    def _catch_up(self) -> bool:
+        """Stage logged changes newer than self.seq. Returns False if the log no longer reaches back."""
+        while True:
+            result = fetch_changes(self.seq)
+            if result["reset"]:
+                return False
+            for change in result["changes"]:
+                self._stage(change["order_id"], change["order"])
+            self.seq = result["last_seq"]
+            if not result["changes"]:
+                break
+        if len(self.delta) > DELTA_LIMIT:
+            self._merge()
+        return True
+
+    def _base_position(self, order_id: int) -> Optional[int]:
+        position = int(np.searchsorted(self.ids, order_id))
+        if position < len(self.ids) and self.ids[position] == order_id:
+            return position
+        return None
+
+    def _stage(self, order_id: int, order: Optional[dict]) -> None:
+        """Record the new state of one order in the overlay (None means deleted)."""
+        # Uncount the currently visible version
+        if order_id in self.delta:
+            previous = self.delta[order_id]
+            if previous is not None:
+                self.status_counts[previous["status"]] -= 1
+        else:
+            position = self._base_position(order_id)
+            if position is not None:
+                self.alive[position] = False
+                previous_status = self.dictionaries["status"][self.cols["status"][position]]
+                self.status_counts[previous_status] -= 1
+        self.delta[order_id] = order
+        if order is not None:
+            self.status_counts[order["status"]] = self.status_counts.get(order["status"], 0) + 1
+
+    def _encode(self, field: str, value: str) -> int:
+        codes = self.codes[field]
+        if value not in codes:
+            codes[value] = len(self.dictionaries[field])
+            self.dictionaries[field].append(value)
+        return codes[value]
+
+    def _merge(self) -> None:
+        """Fold the overlay into the base arrays and their sorted permutations."""
+        keep = self.alive
+        upserts = [self.delta[order_id] for order_id in sorted(self.delta) if self.delta[order_id] is not None]
+        new_ids = np.array([order["id"] for order in upserts], dtype=np.int64)
+        kept_ids = self.ids[keep]
+        insert_at = np.searchsorted(kept_ids, new_ids)
+
+        self.ids = np.insert(kept_ids, insert_at, new_ids)
+        for field in TEXT_FIELDS:
+            values = _text_array([order[field] for order in upserts])
+            self.cols[field] = _insert(self.cols[field][keep], insert_at, values)
+        values = np.array([order["total_amount"] for order in upserts], dtype=np.float64)
+        self.cols["total_amount"] = np.insert(self.cols["total_amount"][keep], insert_at, values)
+        for field in ENCODED_FIELDS:
+            values = np.array([self._encode(field, order[field]) for order in upserts], dtype=np.int16)
+            self.cols[field] = np.insert(self.cols[field][keep], insert_at, values)
+
+        if len(kept_ids) == 0:
+            self._sort_all()
+        else:
+            # Map surviving old positions to their new positions
+            kept_index = np.cumsum(keep) - 1
+            shift = np.searchsorted(insert_at, np.arange(len(kept_ids)), side="right")
+            old_to_new = kept_index + shift[kept_index]
+            new_positions = insert_at + np.arange(len(upserts))
+
+            for field in SORT_FIELDS:
+                perm = self.perms[field]
+                survivors = keep[perm]
+                perm = old_to_new[perm[survivors]]
+                keys = self.keys[field][survivors]
+                if len(upserts):
+                    new_keys = self._sort_keys(field, new_positions)
+                    order = np.argsort(new_keys, kind="stable")
+                    new_keys = new_keys[order]
+                    new_rows = new_positions[order]
+                    if keys.dtype.kind == "S" and new_keys.dtype.itemsize > keys.dtype.itemsize:
+                        keys = keys.astype(new_keys.dtype)
+                    at = np.searchsorted(keys, new_keys, side="left")
+                    end = np.searchsorted(keys, new_keys, side="right")
+                    # Within a run of equal keys, place each new row by id to keep ties in id order
+                    tied = np.flatnonzero(end > at)
+                    run_starts = at[tied]
+                    for start in np.unique(run_starts).tolist():
+                        members = tied[run_starts == start]
+                        tie_ids = self.ids[perm[start:end[members[0]]]]
+                        at[members] += np.searchsorted(tie_ids, self.ids[new_rows[members]])
+                    perm = np.insert(perm, at, new_rows)
+                    keys = _insert(keys, at, new_keys)
+                self.perms[field] = perm
+                self.keys[field] = keys
+
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self.delta = {}
+        self._count_statuses()
+
+    def _sync(self) -> bool:
+        """Bring the mirror up to date with the change log; False means use SQL."""
+        now = time.monotonic()
+        if not self._dirty and now - self._checked < RECHECK_SECONDS:
+            return True
+        # Cleared before reading, so a commit that lands during the read marks it again
+        self._dirty = False
+        self._checked = now
+        if self._catch_up():
+            return True
+        # Fell behind the retained log; rebuild in the background and serve from SQL meanwhile
+        self.ready = False
+        self._rebuild_in_background()
+        return False
+
+    # --- Queries ---
+
+    def _row(self, position: int) -> dict:
+        return {
+            "id": int(self.ids[position]),
+            "order_number": self.cols["order_number"][position].decode(),
+            "customer_name": self.cols["customer_name"][position].decode(),
+            "order_date": self.cols["order_date"][position].decode(),
+            "status": self.dictionaries["status"][self.cols["status"][position]],
+            "total_amount": float(self.cols["total_amount"][position]),
+            "payment_status": self.dictionaries["payment_status"][self.cols["payment_status"][position]],
+        }
+
+    def _first_matches(self, sort_by: str, descending: bool, status_code: Optional[int], need: int):
+        """Base positions of the first `need` visible rows in sort order matching the status."""
+        n = len(self.ids)
+        perm = None if sort_by == "id" else self.perms[sort_by]
+        if perm is not None and descending:
+            perm = perm[::-1]
+        if status_code is None and not self.delta:
+            # Every base row is visible; the page is a plain slice
+            if perm is None:
+                return np.arange(n - 1, max(n - 1 - need, -1), -1) if descending else np.arange(min(need, n))
+            return perm[:need]
+
+        found = []
+        count = 0
+        start = 0
+        step = max(SCAN_CHUNK, need)
+        while start < n and count < need:
+            if perm is None:
+                part = np.arange(n - 1 - start, max(n - 1 - start - step, -1), -1) if descending else np.arange(start, min(start + step, n))
+            else:
+                part = perm[start:start + step]
+            mask = self.alive[part]
+            if status_code is not None:
+                mask &= self.cols["status"][part] == status_code
+            part = part[mask]
+            found.append(part)
+            count += len(part)
+            start += step
+            step *= 2
+        return np.concatenate(found)[:need] if found else np.array([], dtype=np.int64)
+
+    def _delta_key(self, order: dict, sort_by: str):
+        if sort_by in ("id", "total_amount"):
+            return order[sort_by]
+        return order[sort_by].encode()
+
+    def query(self, status: Optional[str], sort_by: str, sort_order: str, offset: int, limit: int) -> Optional[Tuple[int, List[dict]]]:
+        """
+        Return (total matching, page of orders) for a status filter and sort,
+        or None when the mirror can't answer and the caller should use SQL.
+        """
+        if not self.ready:
+            return None
+        with self._lock:
+            if not self.ready or not self._sync():
+                return None
+
+            descending = sort_order == "desc"
+            need = offset + limit
+            if status and sort_by == "status":
+                # Every match has the same status, so the order is just the id tie-break
+                sort_by = "id"
+            if status:
+                total = self.status_counts.get(status, 0)
+                if total == 0:
+                    return 0, []
+                status_code = self.codes["status"].get(status, -1)
+            else:
+                total = sum(self.status_counts.values())
+                status_code = None
+
+            positions = self._first_matches(sort_by, descending, status_code, need)
+            if not self.delta:
+                return total, [self._row(position) for position in positions[offset:need].tolist()]
+
+            # Merge base candidates with matching overlay rows by (key, id)
+            base_keys = self.ids[positions] if sort_by == "id" else self._sort_keys(sort_by, positions)
+            candidates = [
+                (key, int(order_id), position)
+                for key, order_id, position in zip(base_keys.tolist(), self.ids[positions].tolist(), positions.tolist())
+            ]
+            candidates.extend(
+                (self._delta_key(order, sort_by), order["id"], order)
+                for order in self.delta.values()
+                if order is not None and (not status or order["status"] == status)
+            )
+            candidates.sort(key=lambda candidate: (candidate[0], candidate[1]), reverse=descending)
+            return total, [
+                dict(entry) if isinstance(entry, dict) else self._row(entry)
+                for _, _, entry in candidates[offset:need]
+            ]
+
+    def stats(self) -> Optional[Dict[str, int]]:
+        """Return total and per-status counts, or None to use SQL."""
+        if not self.ready:
+            return None
+        with self._lock:
+            if not self.ready or not self._sync():
+                return None
+            return {"total": sum(self.status_counts.values()), **self.status_counts}
+
+
+order_index = OrderIndex()
@@ -1,5 +1,8 @@
+from app.routes.admin import router as admin_router
+from app.routes.batch import router as batch_router
 from app.routes.health import router as health_router
 from app.routes.items import router as items_router
+from app.routes.jobs import router as jobs_router
 from app.routes.orders import router as orders_router
 
-__all__ = ["health_router", "items_router", "orders_router"]
+__all__ = ["admin_router", "batch_router", "health_router", "items_router", "jobs_router", "orders_router"]
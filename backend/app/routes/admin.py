@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException
+
+from app.maintenance import maintenance
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/maintenance")
+def get_maintenance_report():
+    """
+    Database maintenance status and recent runs (newest first).
+    Each run has its task, what triggered it, duration and effect.
+    """
+    try:
+        return {"status": maintenance.status(), "runs": list(reversed(maintenance.history))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.post("/maintenance/run")
+def run_maintenance():
+    """
+    Run checkpoint, statistics and vacuum now, without waiting for a quiet
+    window. The per-run time budget still applies to the vacuum.
+    """
+    try:
+        return {"runs": maintenance.run_now()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
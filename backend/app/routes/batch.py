@@ -0,0 +1,120 @@
+import json
+import re
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, List, Optional
+
+from app.database import savepoint, shared_transaction
+from app.routes import items, orders
+
+router = APIRouter(tags=["batch"])
+
+
+class BatchOperation(BaseModel):
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]] = None
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    # "atomic": all operations commit together or not at all
+    # "per_op": failed operations are rolled back on their own, the rest commit
+    mode: str = "atomic"
+
+
+# Max operations accepted in one batch
+BATCH_MAX_OPERATIONS = 100
+
+# (method, path pattern, handler, body model, success status)
+# Patterns use {id} for the numeric path parameter
+OPERATIONS = [
+    ("GET", "/orders/{id}", orders.get_order, None, 200),
+    ("POST", "/orders", orders.create_order, orders.OrderCreate, 201),
+    ("PUT", "/orders/bulk/status", orders.bulk_update_status, orders.BulkStatusRequest, 200),
+    ("POST", "/orders/bulk/duplicate", orders.bulk_duplicate_orders, orders.BulkIdsRequest, 200),
+    ("DELETE", "/orders/bulk", orders.bulk_delete_orders, orders.BulkIdsRequest, 200),
+    ("PUT", "/orders/{id}", orders.update_order, orders.OrderUpdate, 200),
+    ("DELETE", "/orders/{id}", orders.delete_order, None, 204),
+    ("GET", "/items/{id}", items.get_item, None, 200),
+    ("POST", "/items", items.create_item, items.ItemCreate, 201),
+    ("PUT", "/items/{id}", items.update_item, items.ItemUpdate, 200),
+    ("DELETE", "/items/{id}", items.delete_item, None, 204),
+]
+
+# Path references to earlier results, e.g. "/orders/$0.id"
+REFERENCE_PATTERN = re.compile(r"\$(\d+)\.(\w+)")
+
+
+class _AbortBatch(Exception):
+    """Raised to roll back an atomic batch after a failed operation."""
+
+
+def resolve_path(path: str, results: List[dict]) -> str:
+    """Substitute $<index>.<field> references with values from earlier results."""
+    def substitute(match):
+        index, field = int(match.group(1)), match.group(2)
+        if index >= len(results) or not isinstance(results[index].get("body"), dict):
+            raise HTTPException(status_code=400, detail=f"Unresolved reference {match.group(0)}")
+        if field not in results[index]["body"]:
+            raise HTTPException(status_code=400, detail=f"Unresolved reference {match.group(0)}")
+        return str(results[index]["body"][field])
+    return REFERENCE_PATTERN.sub(substitute, path)
+
+
+def run_operation(operation: BatchOperation, results: List[dict]) -> dict:
+    """Dispatch one operation to its route handler and return its result."""
+    try:
+        path = resolve_path(operation.path, results)
+        for method, pattern, handler, body_model, status_code in OPERATIONS:
+            if method != operation.method.upper():
+                continue
+            match = re.fullmatch(pattern.replace("{id}", r"(\d+)"), path)
+            if not match:
+                continue
+            args = [int(value) for value in match.groups()]
+            if body_model is not None:
+                try:
+                    args.append(body_model(**(operation.body or {})))
+                except ValidationError as e:
+                    raise HTTPException(status_code=422, detail=json.loads(e.json()))
+            return {"status": status_code, "body": handler(*args)}
+        raise HTTPException(status_code=404, detail=f"Unsupported operation: {operation.method} {operation.path}")
+    except HTTPException as e:
+        return {"status": e.status_code, "body": {"detail": e.detail}}
+
+
+@router.post("/batch")
+def run_batch(request: BatchRequest):
+    """
+    Run several order/item operations in one request, on one connection and in
+    one transaction. Each result has the HTTP status and body the individual
+    route would have returned; later paths may reference earlier results with
+    $<index>.<field>. In "atomic" mode the first failure rolls everything back
+    and stops the batch.
+    """
+    if request.mode not in ("atomic", "per_op"):
+        raise HTTPException(status_code=400, detail="mode must be 'atomic' or 'per_op'")
+    if len(request.operations) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_OPERATIONS} operations per batch")
+
+    results: List[dict] = []
+    try:
+        with shared_transaction() as conn:
+            for index, operation in enumerate(request.operations):
+                try:
+                    with savepoint(conn, f"op_{index}"):
+                        result = run_operation(operation, results)
+                        if result["status"] >= 400:
+                            raise _AbortBatch()
+                except _AbortBatch:
+                    pass
+                results.append(result)
+                if result["status"] >= 400 and request.mode == "atomic":
+                    raise _AbortBatch()
+    except _AbortBatch:
+        return {"committed": False, "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    return {"committed": True, "results": results}
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, HTTPException
+import json
+import sqlite3
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Iterator, List, Optional
 
-from app.database import get_db
+from app.admission import yield_to_interactive
+from app.database import FETCH_CHUNK_SIZE, chunked, get_connection, get_db
+from app.routes.schemas import BATCH_GET_MAX_IDS, BatchGetRequest
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -20,18 +27,89 @@ class ItemResponse(BaseModel):
 
 
 @router.get("")
-def list_items():
+def list_items(
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to stream every item"),
+    after_id: int = Query(0, ge=0, description="Return items with an id greater than this (keyset cursor)")
+):
     """
-    List all items from the database.
+    List items from the database.
     Uses raw SQL query (no ORM).
+    With `limit`, returns one keyset page and the `next_after_id` cursor for the
+    next one. Without it, every item is streamed in chunks so the full list is
+    never held in memory.
     """
     try:
+        if limit is None:
+            return StreamingResponse(stream_items(after_id), media_type="application/json")
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, name FROM items ORDER BY id")
+            cursor.execute("SELECT id, name FROM items WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
             rows = cursor.fetchall()
             items = [{"id": row["id"], "name": row["name"]} for row in rows]
-            return {"items": items}
+            next_after_id = items[-1]["id"] if len(items) == limit else None
+            return {"items": items, "next_after_id": next_after_id}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+def stream_items(after_id: int = 0) -> Iterator[str]:
+    """
+    Start streaming the {"items": [...]} listing as JSON text, one fetchmany()
+    chunk at a time, backing off between chunks while interactive requests are
+    in flight. The query runs and its first chunk is read before this
+    returns, so database errors are raised before the response starts. Every
+    chunk comes from that one SELECT, i.e. one read snapshot.
+    """
+    # The body is produced across threadpool calls, so the connection moves between threads
+    conn = get_connection(check_same_thread=False)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name FROM items WHERE id > ? ORDER BY id", (after_id,))
+        rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+    except Exception:
+        conn.close()
+        raise
+    return _stream_items(conn, cursor, rows)
+
+
+def _stream_items(conn: sqlite3.Connection, cursor: sqlite3.Cursor, rows: List[sqlite3.Row]) -> Iterator[str]:
+    try:
+        yield '{"items": ['
+        first = True
+        while rows:
+            chunk = ", ".join(json.dumps({"id": row["id"], "name": row["name"]}) for row in rows)
+            yield chunk if first else ", " + chunk
+            first = False
+            # Runs on the threadpool, so waiting here doesn't block the event loop
+            yield_to_interactive()
+            rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+        yield "]}"
+    finally:
+        conn.close()
+
+
+@router.post("/batch-get")
+def batch_get_items(request: BatchGetRequest):
+    """
+    Get many items by ID in one call.
+    Items are returned in request order; IDs that don't exist are listed in `missing`.
+    """
+    if len(request.ids) > BATCH_GET_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_GET_MAX_IDS} ids per request")
+    try:
+        ids = list(dict.fromkeys(request.ids))
+        found = {}
+        with get_db() as conn:
+            cursor = conn.cursor()
+            for chunk in chunked(ids):
+                placeholders = ", ".join(["?"] * len(chunk))
+                cursor.execute(f"SELECT id, name FROM items WHERE id IN ({placeholders})", chunk)
+                for row in cursor.fetchall():
+                    found[row["id"]] = {"id": row["id"], "name": row["name"]}
+        return {
+            "items": [found[item_id] for item_id in ids if item_id in found],
+            "missing": [item_id for item_id in ids if item_id not in found]
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
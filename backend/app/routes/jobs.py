@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+
+from app.jobs import cancel_job, get_job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}")
+def get_job_status(job_id: int):
+    """
+    Get a background job's status and progress.
+    `processed`/`total` count ids handled so far; `affected` counts rows changed.
+    """
+    try:
+        job = get_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job_run(job_id: int):
+    """
+    Cancel a queued or running job.
+    A running job stops before its next chunk; chunks already committed stay applied.
+    """
+    try:
+        job = cancel_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,8 +1,19 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import json
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 
-from app.database import get_db
+from app.archive import archive_has_rows, archived_counts, archived_id_range, needs_archive, orders_source, restore_orders
+from app.changes import CHANGE_BATCH_SIZE, broker, fetch_changes, latest_seq, record_change, record_changes
+from app.database import chunked, fetch_chunks, get_db, in_shared_transaction
+from app.jobs import register_job_kind, submit_job
+from app.order_index import order_index
+from app.routes.schemas import BATCH_GET_MAX_IDS, BatchGetRequest
+from app.suggest import suggest_index
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -40,6 +51,96 @@ class BulkIdsRequest(BaseModel):
     order_ids: List[int]
 
 
+# Seconds between SSE keep-alive comments
+SSE_KEEPALIVE_SECONDS = 15
+
+# Bulk requests with more ids than this run as a background job
+BULK_INLINE_MAX_IDS = 500
+
+# Columns list_orders can sort by
+ORDER_SORT_FIELDS = ["id", "order_number", "order_date", "total_amount", "payment_status", "customer_name", "status"]
+
+
+def list_orders_queries(conn, status: Optional[str], search: Optional[str], sort_by: str, sort_order: str, hot_only: bool = False):
+    """
+    Build list_orders' COUNT query and page query, each with its own params.
+    The page query takes LIMIT and OFFSET as two extra trailing params.
+    sort_by/sort_order must already be validated. With hot_only the archive is
+    left out even when the filter could match archived orders.
+    """
+    # Base query (only touches the archive when the status filter can match archived orders)
+    source = "orders" if hot_only else orders_source(conn, status)
+    params = []
+    conditions = []
+    page_conditions = []
+
+    if status:
+        conditions.append("status = ?")
+        # Sorted by another column, unary + keeps the planner off the status index: it walks
+        # the sort index (on both sides of a union) and checks status along the way instead
+        # of sorting every order with that status
+        page_conditions.append("status = ?" if sort_by in ("id", "status") else "+status = ?")
+        params.append(status)
+
+    if search:
+        # Basic case-insensitive search
+        conditions.append("(customer_name LIKE ? OR order_number LIKE ?)")
+        page_conditions.append("(customer_name LIKE ? OR order_number LIKE ?)")
+        search_term = f"%{search}%"
+        params.append(search_term)
+        params.append(search_term)
+
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    page_where = " WHERE " + " AND ".join(page_conditions) if page_conditions else ""
+    base_query = f"FROM {source}{where}"
+
+    if source != "orders" and not search:
+        # Count the hot table and take archived orders from their trigger-maintained counts
+        count_query = (
+            f"SELECT (SELECT COUNT(*) FROM orders{where})"
+            f" + (SELECT COALESCE(SUM(orders), 0) FROM orders_archive_counts{where})"
+        )
+        count_params = params + params
+    else:
+        count_query = f"SELECT COUNT(*) {base_query}"
+        count_params = list(params)
+    query = f"SELECT id, order_number, customer_name, order_date, status, total_amount, payment_status FROM {source}{page_where} ORDER BY {sort_by} {sort_order.upper()} LIMIT ? OFFSET ?"
+    return count_query, count_params, query, params
+
+
+def hot_orders_page(conn, status: Optional[str], search: Optional[str], sort_order: str, limit: int, offset: int):
+    """
+    Fetch an id-ordered list_orders page from the hot table alone, or return
+    None when archived orders could fall inside it. Archived orders are
+    normally the oldest ids, so a full page that ends past the archive's id
+    range is the same page the UNION ALL would return.
+    """
+    _, _, query, params = list_orders_queries(conn, status, search, "id", sort_order, hot_only=True)
+    cursor = conn.cursor()
+    cursor.execute(query, params + [limit, offset])
+    rows = cursor.fetchall()
+    if len(rows) < limit:
+        return None
+    lowest, highest = archived_id_range(conn)
+    last_id = rows[-1]["id"]
+    if highest is None or (last_id > highest if sort_order.lower() == "desc" else last_id < lowest):
+        return rows
+    return None
+
+
+def row_to_order(row) -> dict:
+    """Convert an orders row to the response/change-log dict."""
+    return {
+        "id": row["id"],
+        "order_number": row["order_number"],
+        "customer_name": row["customer_name"],
+        "order_date": row["order_date"],
+        "status": row["status"],
+        "total_amount": row["total_amount"],
+        "payment_status": row["payment_status"]
+    }
+
+
 # --- Routes ---
 
 @router.get("", response_model=dict)
@@ -54,64 +155,51 @@ def list_orders(
     """
     Fetch all orders with optional filtering and pagination.
     """
+    # Validate and sanitize sort parameters
+    if sort_by not in ORDER_SORT_FIELDS:
+        sort_by = "id"
+    
+    if sort_order.lower() not in ["asc", "desc"]:
+        sort_order = "desc"
+    
+    offset = (page - 1) * limit
+    
     try:
+        # Serve from the in-memory order index when it is warm (search still goes to SQL)
+        if not search:
+            indexed = order_index.query(status, sort_by, sort_order.lower(), offset, limit)
+            if indexed is not None:
+                total_items, orders = indexed
+                return {
+                    "orders": orders,
+                    "total": total_items,
+                    "page": page,
+                    "limit": limit,
+                    "total_pages": (total_items + limit - 1) // limit
+                }
+        
         with get_db() as conn:
             cursor = conn.cursor()
-            
-            # Base query
-            base_query = "FROM orders"
-            params = []
-            conditions = []
-            
-            if status:
-                conditions.append("status = ?")
-                params.append(status)
-                
-            if search:
-                # Basic case-insensitive search
-                conditions.append("(customer_name LIKE ? OR order_number LIKE ?)")
-                search_term = f"%{search}%"
-                params.append(search_term)
-                params.append(search_term)
-            
-            if conditions:
-                base_query += " WHERE " + " AND ".join(conditions)
+            count_query, count_params, query, params = list_orders_queries(conn, status, search, sort_by, sort_order)
                 
             # Count total matching rows
-            count_query = f"SELECT COUNT(*) {base_query}"
-            cursor.execute(count_query, params)
+            cursor.execute(count_query, count_params)
             total_items = cursor.fetchone()[0]
             
-            # Validate and sanitize sort parameters
-            allowed_sort_fields = ["id", "order_number", "order_date", "total_amount", "payment_status", "customer_name", "status"]
-            if sort_by not in allowed_sort_fields:
-                sort_by = "id"
-            
-            if sort_order.lower() not in ["asc", "desc"]:
-                sort_order = "desc"
+            # Id-ordered pages (the default) usually come from the hot table alone
+            rows = None
+            if offset >= total_items:
+                # Past the last match; also spares a status with few matches a walk of the whole sort index
+                rows = []
+            elif sort_by == "id" and needs_archive(conn, status):
+                rows = hot_orders_page(conn, status, search, sort_order, limit, offset)
             
             # Fetch paginated data with sorting
-            query = f"SELECT id, order_number, customer_name, order_date, status, total_amount, payment_status {base_query} ORDER BY {sort_by} {sort_order.upper()} LIMIT ? OFFSET ?"
+            if rows is None:
+                cursor.execute(query, params + [limit, offset])
+                rows = cursor.fetchall()
             
-            offset = (page - 1) * limit
-            params.append(limit)
-            params.append(offset)
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            orders = [
-                {
-                    "id": row["id"],
-                    "order_number": row["order_number"],
-                    "customer_name": row["customer_name"],
-                    "order_date": row["order_date"],
-                    "status": row["status"],
-                    "total_amount": row["total_amount"],
-                    "payment_status": row["payment_status"]
-                }
-                for row in rows
-            ]
+            orders = [row_to_order(row) for row in rows]
             
             total_pages = (total_items + limit - 1) // limit
             
@@ -132,6 +220,15 @@ def get_order_stats():
     Get statistics for orders.
     """
     try:
+        indexed = order_index.stats()
+        if indexed is not None:
+            return {
+                "total": indexed["total"],
+                "pending": indexed.get("Pending", 0),
+                "shipped": indexed.get("Completed", 0),
+                "refunded": indexed.get("Refunded", 0)
+            }
+        
         with get_db() as conn:
             cursor = conn.cursor()
             
@@ -151,6 +248,12 @@ def get_order_stats():
             cursor.execute("SELECT COUNT(*) FROM orders WHERE status = 'Refunded'")
             refunded = cursor.fetchone()[0]
             
+            # Archived orders are always Completed or Refunded, counted by the archive triggers
+            archived = archived_counts(conn)
+            total += sum(archived.values())
+            shipped += archived.get("Completed", 0)
+            refunded += archived.get("Refunded", 0)
+            
             return {
                 "total": total,
                 "pending": pending,
@@ -161,6 +264,134 @@ def get_order_stats():
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+@router.get("/suggest")
+def suggest_orders(
+    prefix: str = Query(..., min_length=1, description="Start of a customer name or order number"),
+    limit: int = Query(10, ge=1, le=50, description="Max suggestions")
+):
+    """
+    Typeahead suggestions for customer names and order numbers.
+    Served from the in-memory prefix index; falls back to SQL while it is loading.
+    """
+    try:
+        suggestions = suggest_index.suggest(prefix, limit)
+        if suggestions is not None:
+            return {"suggestions": suggestions}
+        
+        with get_db() as conn:
+            cursor = conn.cursor()
+            source = orders_source(conn)
+            term = f"{prefix.strip().lstrip('#')}%"
+            cursor.execute(f"""
+                SELECT customer_name, COUNT(*) AS orders FROM {source}
+                WHERE customer_name LIKE ? GROUP BY customer_name ORDER BY orders DESC LIMIT ?
+            """, (term, limit))
+            suggestions = [{"value": row["customer_name"], "kind": "customer"} for row in cursor.fetchall()]
+            if len(suggestions) < limit:
+                cursor.execute(f"""
+                    SELECT order_number FROM {source}
+                    WHERE order_number LIKE ? OR order_number LIKE ?
+                    GROUP BY order_number ORDER BY MAX(id) DESC LIMIT ?
+                """, (term, f"#{term}", limit - len(suggestions)))
+                suggestions += [{"value": row["order_number"], "kind": "order_number"} for row in cursor.fetchall()]
+            return {"suggestions": suggestions}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/changes")
+async def get_order_changes(
+    since: int = Query(0, ge=0, description="Return changes after this sequence number"),
+    limit: int = Query(100, ge=1, le=CHANGE_BATCH_SIZE, description="Max changes to return"),
+    timeout: float = Query(25, ge=0, le=60, description="Seconds to wait for a change before returning empty")
+):
+    """
+    Long-poll the order change feed.
+    Returns immediately when changes after `since` exist, otherwise waits up to
+    `timeout` seconds for the next one. Clients resume from `last_seq`; when
+    `reset` is true they have fallen behind the retained log and must reload.
+    """
+    sub = broker.subscribe(since)
+    try:
+        result = await run_in_threadpool(fetch_changes, since, limit)
+        if result["changes"] or result["reset"] or timeout == 0:
+            return result
+        try:
+            await asyncio.wait_for(sub.get(), timeout)
+        except asyncio.TimeoutError:
+            return result
+        return await run_in_threadpool(fetch_changes, since, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    finally:
+        broker.unsubscribe(sub)
+
+
+@router.get("/changes/stream")
+async def stream_order_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Replay changes after this sequence number"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events stream of order changes.
+    Starts from `since` (or the Last-Event-ID header on reconnect), or from now
+    if neither is given. Each event's id is its sequence number.
+    """
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    if since is None:
+        since = await run_in_threadpool(latest_seq)
+
+    def format_event(change: dict) -> str:
+        return f"id: {change['seq']}\nevent: change\ndata: {json.dumps(change)}\n\n"
+
+    async def events():
+        cursor = since
+        sub = broker.subscribe(cursor)
+        try:
+            catch_up = True
+            while True:
+                if catch_up:
+                    # Replay from the log until caught up; also used after falling behind
+                    sub.lagged = False
+                    sub.drain()
+                    while True:
+                        result = await run_in_threadpool(fetch_changes, cursor)
+                        if result["reset"]:
+                            yield f"event: reset\ndata: {json.dumps({'last_seq': result['last_seq']})}\n\n"
+                            return
+                        for change in result["changes"]:
+                            cursor = change["seq"]
+                            yield format_event(change)
+                        if len(result["changes"]) < CHANGE_BATCH_SIZE:
+                            break
+                    catch_up = False
+
+                if await request.is_disconnected():
+                    return
+                if sub.lagged:
+                    catch_up = True
+                    continue
+                try:
+                    change = await asyncio.wait_for(sub.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if change["seq"] <= cursor:
+                    continue
+                cursor = change["seq"]
+                yield format_event(change)
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(order_id: int):
     """
@@ -175,24 +406,57 @@ def get_order(order_id: int):
             """, (order_id,))
             row = cursor.fetchone()
             
+            if row is None:
+                # Fall back to the archive for cold orders
+                cursor.execute("""
+                    SELECT id, order_number, customer_name, order_date, status, total_amount, payment_status 
+                    FROM orders_archive WHERE id = ?
+                """, (order_id,))
+                row = cursor.fetchone()
+            
             if row is None:
                 raise HTTPException(status_code=404, detail="Order not found")
                 
-            return {
-                "id": row["id"],
-                "order_number": row["order_number"],
-                "customer_name": row["customer_name"],
-                "order_date": row["order_date"],
-                "status": row["status"],
-                "total_amount": row["total_amount"],
-                "payment_status": row["payment_status"]
-            }
+            return row_to_order(row)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+@router.post("/batch-get")
+def batch_get_orders(request: BatchGetRequest):
+    """
+    Fetch many orders by ID in one call.
+    Orders are returned in request order; IDs that don't exist are listed in `missing`.
+    """
+    if len(request.ids) > BATCH_GET_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_GET_MAX_IDS} ids per request")
+    try:
+        ids = list(dict.fromkeys(request.ids))
+        found = {}
+        with get_db() as conn:
+            cursor = conn.cursor()
+            # Hot table first, then only the leftovers from the archive
+            tables = ["orders", "orders_archive"] if archive_has_rows(conn) else ["orders"]
+            for table in tables:
+                remaining = [order_id for order_id in ids if order_id not in found]
+                for chunk in chunked(remaining):
+                    placeholders = ", ".join(["?"] * len(chunk))
+                    cursor.execute(f"""
+                        SELECT id, order_number, customer_name, order_date, status, total_amount, payment_status
+                        FROM {table} WHERE id IN ({placeholders})
+                    """, chunk)
+                    for row in cursor.fetchall():
+                        found[row["id"]] = row_to_order(row)
+        return {
+            "orders": [found[order_id] for order_id in ids if order_id in found],
+            "missing": [order_id for order_id in ids if order_id not in found]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
 @router.post("", status_code=201, response_model=OrderResponse)
 def create_order(order: OrderCreate):
     """
@@ -207,11 +471,13 @@ def create_order(order: OrderCreate):
             """, (order.order_number, order.customer_name, order.order_date, order.status, order.total_amount, order.payment_status))
             
             order_id = cursor.lastrowid
-            
-            return {
+            created = {
                 "id": order_id,
                 **order.dict()
             }
+            record_change(conn, "created", order_id, created)
+            
+            return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -225,6 +491,9 @@ def update_order(order_id: int, order: OrderUpdate):
         with get_db() as conn:
             cursor = conn.cursor()
             
+            # Archived orders are moved back to the hot table before being modified
+            restore_orders(conn, [order_id])
+            
             # Check existence
             cursor.execute("SELECT * FROM orders WHERE id = ?", (order_id,))
             existing = cursor.fetchone()
@@ -235,15 +504,7 @@ def update_order(order_id: int, order: OrderUpdate):
             update_data = order.dict(exclude_unset=True)
             if not update_data:
                 # Nothing to update, return existing
-                return {
-                    "id": existing["id"],
-                    "order_number": existing["order_number"],
-                    "customer_name": existing["customer_name"],
-                    "order_date": existing["order_date"],
-                    "status": existing["status"],
-                    "total_amount": existing["total_amount"],
-                    "payment_status": existing["payment_status"]
-                }
+                return row_to_order(existing)
                 
             set_clauses = [f"{key} = ?" for key in update_data.keys()]
             values = list(update_data.values())
@@ -254,17 +515,10 @@ def update_order(order_id: int, order: OrderUpdate):
             
             # Fetch updated
             cursor.execute("SELECT * FROM orders WHERE id = ?", (order_id,))
-            updated = cursor.fetchone()
+            updated = row_to_order(cursor.fetchone())
+            record_change(conn, "updated", order_id, updated)
             
-            return {
-                "id": updated["id"],
-                "order_number": updated["order_number"],
-                "customer_name": updated["customer_name"],
-                "order_date": updated["order_date"],
-                "status": updated["status"],
-                "total_amount": updated["total_amount"],
-                "payment_status": updated["payment_status"]
-            }
+            return updated
     except HTTPException:
         raise
     except Exception as e:
@@ -280,8 +534,11 @@ def delete_order(order_id: int):
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM orders WHERE id = ?", (order_id,))
+            if cursor.rowcount == 0:
+                cursor.execute("DELETE FROM orders_archive WHERE id = ?", (order_id,))
             if cursor.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Order not found")
+            record_change(conn, "deleted", order_id)
             return None
     except HTTPException:
         raise
@@ -291,22 +548,104 @@ def delete_order(order_id: int):
 
 # --- Bulk Operations ---
 
+def bulk_update_status_chunk(conn, order_ids: List[int], params: dict) -> int:
+    """Set the status of one chunk of orders (restoring archived ones); return rows updated."""
+    cursor = conn.cursor()
+    restore_orders(conn, order_ids)
+    
+    placeholders = ", ".join(["?"] * len(order_ids))
+    query = f"UPDATE orders SET status = ? WHERE id IN ({placeholders})"
+    
+    cursor.execute(query, [params["status"]] + list(order_ids))
+    updated_count = cursor.rowcount
+    
+    cursor.execute(f"SELECT * FROM orders WHERE id IN ({placeholders})", order_ids)
+    for rows in fetch_chunks(cursor):
+        record_changes(conn, "updated", [(row["id"], row_to_order(row)) for row in rows])
+    return updated_count
+
+
+def bulk_duplicate_chunk(conn, order_ids: List[int], params: dict) -> int:
+    """Duplicate one chunk of orders; return the number of copies created."""
+    # Separate cursors so inserts don't reset the one being read from
+    read_cursor = conn.cursor()
+    write_cursor = conn.cursor()
+    
+    placeholders = ", ".join(["?"] * len(order_ids))
+    read_cursor.execute(f"SELECT * FROM {orders_source(conn)} WHERE id IN ({placeholders})", order_ids)
+    
+    new_orders_count = 0
+    for rows in fetch_chunks(read_cursor):
+        new_orders = []
+        for row in rows:
+            new_order_number = f"{row['order_number']} (Copy)"
+            write_cursor.execute("""
+                INSERT INTO orders (order_number, customer_name, order_date, status, total_amount, payment_status)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (new_order_number, row['customer_name'], row['order_date'], row['status'], row['total_amount'], row['payment_status']))
+            new_orders.append({**row_to_order(row), "id": write_cursor.lastrowid, "order_number": new_order_number})
+        
+        record_changes(conn, "created", [(new_order["id"], new_order) for new_order in new_orders])
+        new_orders_count += len(new_orders)
+    return new_orders_count
+
+
+def bulk_delete_chunk(conn, order_ids: List[int], params: dict) -> int:
+    """Delete one chunk of orders from the hot table and the archive; return rows deleted."""
+    cursor = conn.cursor()
+    source = orders_source(conn)
+    
+    placeholders = ", ".join(["?"] * len(order_ids))
+    cursor.execute(f"SELECT id FROM {source} WHERE id IN ({placeholders})", order_ids)
+    deleted_ids = [row["id"] for row in cursor.fetchall()]
+    
+    cursor.execute(f"DELETE FROM orders WHERE id IN ({placeholders})", order_ids)
+    deleted = cursor.rowcount
+    
+    if source != "orders":
+        cursor.execute(f"DELETE FROM orders_archive WHERE id IN ({placeholders})", order_ids)
+        deleted += cursor.rowcount
+    
+    record_changes(conn, "deleted", [(order_id, None) for order_id in deleted_ids])
+    return deleted
+
+
+# kind -> (chunk handler, result message); also run by the background job worker
+BULK_HANDLERS = {
+    "bulk_status": (bulk_update_status_chunk, "Updated {count} orders to status '{status}'"),
+    "bulk_duplicate": (bulk_duplicate_chunk, "Duplicated {count} orders"),
+    "bulk_delete": (bulk_delete_chunk, "Deleted {count} orders"),
+}
+for kind, (handler, message) in BULK_HANDLERS.items():
+    register_job_kind(kind, handler, message)
+
+
+def run_bulk(kind: str, order_ids: List[int], params: dict):
+    """
+    Run a bulk operation inline in one transaction, or queue it as a
+    background job when it spans more than one chunk. Inside a /batch
+    transaction it always runs inline so the batch stays atomic.
+    """
+    if len(order_ids) > BULK_INLINE_MAX_IDS and not in_shared_transaction():
+        job = submit_job(kind, order_ids, params)
+        return JSONResponse(status_code=202, content=job, headers={"Location": f"/jobs/{job['id']}"})
+    
+    handler, message = BULK_HANDLERS[kind]
+    count = 0
+    with get_db() as conn:
+        for chunk in chunked(order_ids):
+            count += handler(conn, chunk, params)
+    return {"message": message.format(**params, count=count)}
+
+
 @router.put("/bulk/status")
 def bulk_update_status(request: BulkStatusRequest):
     """
     Bulk update status for multiple orders.
+    Large requests are queued as a background job (202 with the job).
     """
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            
-            placeholders = ", ".join(["?"] * len(request.order_ids))
-            query = f"UPDATE orders SET status = ? WHERE id IN ({placeholders})"
-            
-            params = [request.status] + request.order_ids
-            cursor.execute(query, params)
-            
-            return {"message": f"Updated {cursor.rowcount} orders to status '{request.status}'"}
+        return run_bulk("bulk_status", request.order_ids, {"status": request.status})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -315,27 +654,10 @@ def bulk_update_status(request: BulkStatusRequest):
 def bulk_duplicate_orders(request: BulkIdsRequest):
     """
     Duplicate multiple orders.
+    Large requests are queued as a background job (202 with the job).
     """
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            
-            placeholders = ", ".join(["?"] * len(request.order_ids))
-            select_query = f"SELECT * FROM orders WHERE id IN ({placeholders})"
-            cursor.execute(select_query, request.order_ids)
-            rows = cursor.fetchall()
-            
-            new_orders_count = 0
-            for row in rows:
-                new_order_number = f"{row['order_number']} (Copy)"
-                cursor.execute("""
-                    INSERT INTO orders (order_number, customer_name, order_date, status, total_amount, payment_status)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (new_order_number, row['customer_name'], row['order_date'], row['status'], row['total_amount'], row['payment_status']))
-                new_orders_count += 1
-                
-            return {"message": f"Duplicated {new_orders_count} orders"}
-            
+        return run_bulk("bulk_duplicate", request.order_ids, {})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -344,16 +666,9 @@ def bulk_duplicate_orders(request: BulkIdsRequest):
 def bulk_delete_orders(request: BulkIdsRequest):
     """
     Bulk delete multiple orders.
+    Large requests are queued as a background job (202 with the job).
     """
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            
-            placeholders = ", ".join(["?"] * len(request.order_ids))
-            query = f"DELETE FROM orders WHERE id IN ({placeholders})"
-            
-            cursor.execute(query, request.order_ids)
-            
-            return {"message": f"Deleted {cursor.rowcount} orders"}
+        return run_bulk("bulk_delete", request.order_ids, {})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -0,0 +1,11 @@
+from typing import List
+
+from pydantic import BaseModel
+
+# Max ids accepted by a single batch-get call
+BATCH_GET_MAX_IDS = 1000
+
+
+# Body of the /orders and /items batch-get routes
+class BatchGetRequest(BaseModel):
+    ids: List[int]
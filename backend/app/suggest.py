@@ -0,0 +1,223 @@
+"""
+In-memory prefix index for customer-name / order-number typeahead.
+
+Keys are kept in a sorted list and looked up with bisect. Customer names are
+ranked by how many orders they have, order numbers by recency. New and
+renamed values are picked up from the order_changes log; counts are
+recomputed exactly (which also drops deleted values) by a periodic rebuild
+from the database.
+"""
+
+import heapq
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.archive import orders_source
+from app.changes import fetch_changes, latest_seq
+from app.database import add_commit_hook, fetch_chunks, get_db
+
+# Max distinct values held in memory (split between customer names and order numbers)
+SUGGEST_MAX_ENTRIES = int(os.getenv("SUGGEST_MAX_ENTRIES", "100000"))
+
+# Seconds between exact rebuilds from the database
+SUGGEST_REBUILD_SECONDS = int(os.getenv("SUGGEST_REBUILD_SECONDS", "600"))
+
+# Prefix ranges larger than this are ranked once and their top keys cached
+SCAN_LIMIT = 1000
+CACHE_SIZE = 2048
+CACHE_TOP_K = 50
+
+CUSTOMER = "customer"
+ORDER_NUMBER = "order_number"
+
+Key = Tuple[str, str]
+
+
+def normalize(text: str) -> str:
+    """Case-insensitive key; a leading '#' on order numbers is optional when typing."""
+    return text.strip().lower().lstrip("#")
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._dirty = False
+        self.ready = False
+        self.seq = 0
+        self._keys: List[Key] = []
+        self._entries: Dict[Key, dict] = {}
+        self._cache: "OrderedDict[str, List[Key]]" = OrderedDict()
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        add_commit_hook(self._mark_dirty)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="suggest-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.ready = False
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"Suggest index rebuild failed: {e}")
+            self._stop.wait(SUGGEST_REBUILD_SECONDS)
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+
+    # --- Building ---
+
+    def rebuild(self) -> None:
+        """Reload the most frequent customers and most recent order numbers."""
+        limit = SUGGEST_MAX_ENTRIES // 2
+        entries: Dict[Key, dict] = {}
+        with get_db() as conn:
+            cursor = conn.cursor()
+            # One read snapshot for the sequence number and the aggregates, so orders
+            # created meanwhile are counted by exactly one of the rebuild and _catch_up()
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM order_changes")
+            seq = cursor.fetchone()[0]
+            source = orders_source(conn)
+            cursor.execute(f"""
+                SELECT customer_name, COUNT(*) AS orders FROM {source}
+                GROUP BY customer_name ORDER BY orders DESC LIMIT ?
+            """, (limit,))
+            for rows in fetch_chunks(cursor):
+                for row in rows:
+                    self._add(entries, row["customer_name"], CUSTOMER, row["orders"])
+            cursor.execute(f"SELECT id, order_number FROM {source} ORDER BY id DESC LIMIT ?", (limit,))
+            for rows in fetch_chunks(cursor):
+                for row in rows:
+                    self._add(entries, row["order_number"], ORDER_NUMBER, row["id"])
+        with self._lock:
+            self._entries = entries
+            self._keys = sorted(entries)
+            self._cache.clear()
+            self.seq = seq
+            self._dirty = True
+            self._catch_up()
+            self.ready = True
+
+    @staticmethod
+    def _add(entries: Dict[Key, dict], value: str, kind: str, rank: int) -> Optional[Key]:
+        key = (normalize(value), kind)
+        if not key[0]:
+            return None
+        entry = entries.get(key)
+        if entry is None:
+            entries[key] = {"value": value, "kind": kind, "rank": rank}
+        elif kind == CUSTOMER:
+            entry["rank"] += rank
+        else:
+            entry["rank"] = max(entry["rank"], rank)
+        return key
+
+    # --- Incremental sync ---
+
+    def _catch_up(self) -> None:
+        """Apply new/updated orders from the change log since the last sync."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        while True:
+            result = fetch_changes(self.seq)
+            if result["reset"]:
+                # Missed changes are picked up by the next full rebuild
+                self.seq = latest_seq()
+                return
+            for change in result["changes"]:
+                order = change["order"]
+                if order is None:
+                    continue
+                # Only new orders add to a customer's count; ids double as recency for order numbers
+                customer_rank = 1 if change["op"] == "created" else 0
+                self._insert(order["customer_name"], CUSTOMER, customer_rank)
+                self._insert(order["order_number"], ORDER_NUMBER, order["id"])
+            self.seq = result["last_seq"]
+            if not result["changes"]:
+                break
+        if len(self._entries) > SUGGEST_MAX_ENTRIES * 1.1:
+            self._evict()
+
+    def _insert(self, value: str, kind: str, rank: int) -> None:
+        is_new = (normalize(value), kind) not in self._entries
+        key = self._add(self._entries, value, kind, rank)
+        if key is None:
+            return
+        if is_new:
+            insort(self._keys, key)
+        # Ranks only grow between rebuilds, so cached top lists can be patched in place
+        score = self._score(key)
+        for end in range(1, len(key[0]) + 1):
+            top = self._cache.get(key[0][:end])
+            if top is None:
+                continue
+            if key in top or score > self._score(top[-1]):
+                if key not in top:
+                    top.append(key)
+                top.sort(key=self._score, reverse=True)
+                del top[CACHE_TOP_K:]
+
+    def _evict(self) -> None:
+        """Keep the memory cap by dropping the lowest-ranked values of each kind."""
+        for kind in (CUSTOMER, ORDER_NUMBER):
+            keys = [key for key in self._entries if key[1] == kind]
+            excess = len(keys) - SUGGEST_MAX_ENTRIES // 2
+            if excess > 0:
+                for key in heapq.nsmallest(excess, keys, key=lambda key: self._entries[key]["rank"]):
+                    del self._entries[key]
+        self._keys = sorted(self._entries)
+        self._cache.clear()
+
+    # --- Queries ---
+
+    def _score(self, key: Key) -> Tuple[bool, int]:
+        # Customers first (by order count), then order numbers (most recent first)
+        return key[1] == CUSTOMER, self._entries[key]["rank"]
+
+    def _top(self, prefix: str, k: int) -> List[Key]:
+        lo = bisect_left(self._keys, (prefix,))
+        hi = bisect_left(self._keys, (prefix + "\uffff",))
+        if hi - lo <= SCAN_LIMIT:
+            return heapq.nlargest(k, self._keys[lo:hi], key=self._score)
+        top = self._cache.get(prefix)
+        if top is None:
+            top = heapq.nlargest(CACHE_TOP_K, self._keys[lo:hi], key=self._score)
+            self._cache[prefix] = top
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(prefix)
+        return top[:k]
+
+    def suggest(self, prefix: str, limit: int) -> Optional[List[dict]]:
+        """Return up to `limit` suggestions for a prefix, or None if the index isn't built yet."""
+        if not self.ready:
+            return None
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            if self._dirty:
+                self._catch_up()
+            return [
+                {"value": self._entries[key]["value"], "kind": key[1]}
+                for key in self._top(prefix, limit)
+            ]
+
+
+suggest_index = SuggestIndex()
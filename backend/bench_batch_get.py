@@ -0,0 +1,88 @@
+"""
+Batch-Get Benchmark
+
+Compares fetching N orders / items with one POST /{orders,items}/batch-get
+call against N sequential GET /{orders,items}/{id} calls, over HTTP against a
+uvicorn server on a synthetic database. Both sides reuse one keep-alive
+connection, and the batch result is checked against the single GETs.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from app.routes.schemas import BATCH_GET_MAX_IDS
+from benchmark_data import build_database, request, serve
+
+
+def time_singles(conn, resource, ids):
+    start = time.perf_counter()
+    found = {}
+    for record_id in ids:
+        status, body = request(conn, "GET", f"/{resource}/{record_id}")
+        if status == 200:
+            found[record_id] = json.loads(body)
+    return (time.perf_counter() - start) * 1000, found
+
+
+def time_batch(conn, resource, ids):
+    start = time.perf_counter()
+    status, body = request(conn, "POST", f"/{resource}/batch-get", {"ids": ids})
+    elapsed = (time.perf_counter() - start) * 1000
+    if status != 200:
+        raise RuntimeError(f"batch-get returned {status}: {body[:200]}")
+    return elapsed, json.loads(body)
+
+
+def run_benchmark(host, port, rows, count, repeat):
+    """Print single vs batch timings per resource; return the number of result mismatches."""
+    rng = random.Random(7)
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    mismatches = 0
+    print("-" * 60)
+    for resource in ("orders", "items"):
+        # One id past the end, to exercise the missing list
+        ids = rng.sample(range(1, rows + 1), count - 1) + [rows + 1]
+        singles, batches = [], []
+        for _ in range(repeat):
+            single_ms, found = time_singles(conn, resource, ids)
+            batch_ms, result = time_batch(conn, resource, ids)
+            singles.append(single_ms)
+            batches.append(batch_ms)
+        if result[resource] != [found[record_id] for record_id in ids if record_id in found]:
+            mismatches += 1
+        if result["missing"] != [record_id for record_id in ids if record_id not in found]:
+            mismatches += 1
+        single, batch = statistics.median(singles), statistics.median(batches)
+        print(f"{resource:<7} {count} ids: {count} single GETs {single:8.1f}ms | one batch-get {batch:6.1f}ms | {single / batch:5.1f}x")
+    print("-" * 60)
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="batch-get vs single GET benchmark")
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic orders and items to generate")
+    parser.add_argument("--ids", type=int, default=200, help=f"Ids per batch (at most {BATCH_GET_MAX_IDS})")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs (median is kept)")
+    parser.add_argument("--database", help="Where to build the synthetic database (default: a temporary file)")
+
+    args = parser.parse_args()
+    if not 1 < args.ids <= BATCH_GET_MAX_IDS:
+        parser.error(f"--ids must be between 2 and {BATCH_GET_MAX_IDS}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database or os.path.join(tmp, "batch_get.db")
+        build_database(path, args.rows, args.rows)
+        with serve(path) as (host, port):
+            mismatches = run_benchmark(host, port, args.rows, args.ids, args.repeat)
+
+    if mismatches:
+        print("batch-get results differ from the single GETs.")
+        sys.exit(1)
+    print("batch-get results match the single GETs.")
@@ -0,0 +1,144 @@
+"""
+Memory Regression Check
+
+Builds a large synthetic database (default 1M orders and 1M items), calls
+every list and bulk route handler in-process under tracemalloc and records
+each one's peak Python allocation. Fails when a peak grows past its recorded
+baseline, so a fetchall() or full-list build sneaking back in gets caught.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Bulk jobs are run to completion here; the pause between chunks only matters with live traffic
+os.environ.setdefault("JOB_CHUNK_PAUSE_SECONDS", "0")
+
+from app import jobs
+from app.routes import items, orders
+from app.routes.schemas import BATCH_GET_MAX_IDS, BatchGetRequest
+from benchmark_data import build_database
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memory_baselines.json")
+
+MIB = 1024 * 1024
+
+
+def consume(body):
+    """Drain a streamed response body, keeping only its size."""
+    return sum(len(chunk) for chunk in body)
+
+
+def run_job(response):
+    """Run the job a bulk route queued (202) to completion on this thread."""
+    if getattr(response, "status_code", 200) == 202:
+        job = jobs._claim_next_job()
+        jobs.worker._process(job)
+        status = jobs.get_job(job["id"])["status"]
+        if status != "completed":
+            raise RuntimeError(f"Job {job['id']} ended {status}")
+
+
+def cases(rows, bulk_ids):
+    """(name, callable) for every list and bulk route, in run order."""
+    rng = random.Random(3)
+    status_ids = rng.sample(range(1, rows + 1), bulk_ids)
+    duplicate_ids = rng.sample(range(1, rows + 1), bulk_ids)
+    delete_ids = rng.sample(range(1, rows + 1), bulk_ids)
+    batch_ids = rng.sample(range(1, rows + 1), BATCH_GET_MAX_IDS)
+    return [
+        ("GET /items (streamed)", lambda: consume(items.stream_items())),
+        ("GET /items?limit=1000", lambda: items.list_items(limit=1000, after_id=rows // 2)),
+        ("POST /items/batch-get", lambda: items.batch_get_items(BatchGetRequest(ids=batch_ids))),
+        ("GET /orders", lambda: orders.list_orders(page=1, limit=100, status=None, search=None, sort_by="id", sort_order="desc")),
+        ("GET /orders deep page", lambda: orders.list_orders(page=rows // 600, limit=100, status="Pending", search=None, sort_by="order_date", sort_order="asc")),
+        ("GET /orders search", lambda: orders.list_orders(page=1, limit=100, status=None, search="Customer 1", sort_by="id", sort_order="desc")),
+        ("GET /orders/stats", orders.get_order_stats),
+        ("POST /orders/batch-get", lambda: orders.batch_get_orders(BatchGetRequest(ids=batch_ids))),
+        ("PUT /orders/bulk/status", lambda: run_job(orders.bulk_update_status(orders.BulkStatusRequest(order_ids=status_ids, status="Refunded")))),
+        ("POST /orders/bulk/duplicate", lambda: run_job(orders.bulk_duplicate_orders(orders.BulkIdsRequest(order_ids=duplicate_ids)))),
+        ("DELETE /orders/bulk", lambda: run_job(orders.bulk_delete_orders(orders.BulkIdsRequest(order_ids=delete_ids)))),
+    ]
+
+
+def measure(call):
+    """Return (peak MiB allocated while running call, seconds)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (peak - before) / MIB, elapsed
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_checks(rows, bulk_ids, baselines_path, update_baselines, max_growth):
+    """Measure every case; return the number of regressions."""
+    baselines = load_baselines(baselines_path)
+    if baselines is not None and (baselines.get("rows"), baselines.get("bulk_ids")) != (rows, bulk_ids):
+        print(f"Baselines were recorded with {baselines.get('rows')} rows / {baselines.get('bulk_ids')} bulk ids; skipping comparison.")
+        baselines = None
+
+    failures = 0
+    peaks = {}
+    print("-" * 60)
+    for name, call in cases(rows, bulk_ids):
+        peak, elapsed = measure(call)
+        peaks[name] = round(peak, 2)
+        result = "OK"
+        if baselines is not None and name in baselines["peak_mib"]:
+            baseline = baselines["peak_mib"][name]
+            # Sub-MiB differences are allocator noise, not regressions
+            if max_growth and peak > baseline * max_growth and peak - baseline > 1.0:
+                result = f"GREW: {peak:.2f} MiB vs baseline {baseline:.2f} MiB"
+        if result != "OK":
+            failures += 1
+        print(f"[{'PASS' if result == 'OK' else 'FAIL'}] {name:<30} peak {peak:8.2f} MiB {elapsed:7.2f}s  {result if result != 'OK' else ''}")
+    print("-" * 60)
+
+    if update_baselines:
+        with open(baselines_path, "w") as f:
+            json.dump({"rows": rows, "bulk_ids": bulk_ids, "peak_mib": peaks}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Memory baselines written to {baselines_path}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="tracemalloc peak check for list and bulk routes")
+    parser.add_argument("--rows", type=int, default=1000000, help="Synthetic orders and items to generate")
+    parser.add_argument("--bulk-ids", type=int, default=100000, help="Ids per bulk status / duplicate / delete call")
+    parser.add_argument("--baselines", default=BASELINES_PATH, help="Peak memory baselines file")
+    parser.add_argument("--update-baselines", action="store_true", help="Record this run's peaks as the new baselines")
+    parser.add_argument(
+        "--max-growth", type=float, default=2.0,
+        help="Fail when a peak is this many times its baseline (0 to only report)"
+    )
+    parser.add_argument("--database", help="Where to build the synthetic database (default: a temporary file)")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database or os.path.join(tmp, "memory.db")
+        start = time.perf_counter()
+        build_database(path, args.rows, args.rows)
+        print(f"Built {args.rows} orders and items in {time.perf_counter() - start:.1f}s")
+        failures = run_checks(args.rows, args.bulk_ids, args.baselines, args.update_baselines, args.max_growth)
+
+    if failures:
+        print(f"{failures} route(s) regressed.")
+        sys.exit(1)
+    print("All routes within their memory baselines.")
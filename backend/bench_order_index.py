@@ -0,0 +1,99 @@
+"""
+Order Index Benchmark
+
+Times list_orders and /orders/stats on a large synthetic database (default 1M
+orders) through SQL, then again once the in-memory order index is built,
+for a spread of status filters, sorts and page depths. Also times the first
+read after a write, which replays the change log into the overlay.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("ORDER_INDEX_ENABLED", "1")
+
+from app.order_index import order_index
+from app.routes import orders
+from benchmark_data import build_database
+
+# (label, status, sort_by, sort_order, page); pages are of PAGE_LIMIT orders
+CASES = [
+    ("default", None, "id", "desc", 1),
+    ("sort order_date", None, "order_date", "desc", 1),
+    ("sort customer_name", None, "customer_name", "asc", 1),
+    ("sort total_amount", None, "total_amount", "desc", 1),
+    ("Pending", "Pending", "id", "desc", 1),
+    ("Pending + order_date", "Pending", "order_date", "desc", 1),
+    ("Completed + customer_name", "Completed", "customer_name", "asc", 1),
+    ("Pending + order_date, deep", "Pending", "order_date", "asc", 500),
+    ("sort payment_status, deep", None, "payment_status", "desc", 1000),
+]
+
+PAGE_LIMIT = 100
+
+
+def time_call(call, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def list_call(status, sort_by, sort_order, page):
+    return lambda: orders.list_orders(
+        page=page, limit=PAGE_LIMIT, status=status, search=None, sort_by=sort_by, sort_order=sort_order
+    )
+
+
+def run_benchmark(repeat):
+    # SQL first: list_orders falls back to it while the index isn't ready
+    sql = {label: time_call(list_call(*case), repeat) for label, *case in CASES}
+    sql_stats = time_call(orders.get_order_stats, repeat)
+
+    start = time.perf_counter()
+    order_index.start()
+    while not order_index.ready:
+        time.sleep(0.05)
+    print(f"Order index built in {time.perf_counter() - start:.1f}s")
+
+    indexed = {label: time_call(list_call(*case), repeat) for label, *case in CASES}
+    indexed_stats = time_call(orders.get_order_stats, repeat)
+
+    print("-" * 60)
+    print(f"{'case':<30} {'SQL':>10} {'index':>10}")
+    for label, *_ in CASES:
+        print(f"{label:<30} {sql[label]:8.2f}ms {indexed[label]:8.2f}ms")
+    print(f"{'/orders/stats':<30} {sql_stats:8.2f}ms {indexed_stats:8.2f}ms")
+
+    # Each write marks the index dirty; the next read replays it from the change log
+    after_write = []
+    for n in range(repeat):
+        orders.create_order(orders.OrderCreate(
+            order_number=f"#BENCH{n}", customer_name="Bench", order_date="01 Jan 2026",
+            status="Pending", total_amount=1.0, payment_status="Paid",
+        ))
+        after_write.append(time_call(list_call(None, "id", "desc", 1), 1))
+    print(f"{'first read after a write':<30} {'':>10} {statistics.median(after_write):8.2f}ms")
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory order index vs SQL benchmark")
+    parser.add_argument("--rows", type=int, default=1000000, help="Synthetic orders to generate")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (median is kept)")
+    parser.add_argument("--archive", action="store_true", help="Compact cold orders into the archive first")
+    parser.add_argument("--database", help="Where to build the synthetic database (default: a temporary file)")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database or os.path.join(tmp, "order_index.db")
+        start = time.perf_counter()
+        build_database(path, args.rows, archive=args.archive)
+        print(f"Built {args.rows} orders in {time.perf_counter() - start:.1f}s")
+        run_benchmark(args.repeat)
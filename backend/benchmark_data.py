@@ -0,0 +1,139 @@
+"""
+Benchmark Data and Server Helpers
+
+Generates large synthetic databases for the benchmark and load-test scripts
+(bench_*.py, load_test_admission.py) and starts the app against them under
+uvicorn. Can also be run on its own to build a database to reuse:
+
+    python benchmark_data.py --orders 1000000 --items 1000000 --database bench.db
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from app import database
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STATUSES = ["Pending", "Completed", "Refunded"]
+PAYMENT_STATUSES = ["Paid", "Unpaid"]
+
+INSERT_BATCH = 10000
+
+
+def build_database(path, orders, items=0, archive=False):
+    """
+    Create a migrated database at `path` with synthetic orders and items.
+    Order ids follow order_date (oldest first, spread over two years), like a
+    real order history. With `archive`, cold orders are compacted into the
+    archive afterwards.
+    """
+    import migrate
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    database.DATABASE_PATH = path
+    migrate.run_migrations("upgrade")
+
+    rng = random.Random(42)
+    customers = [f"Customer {n}" for n in range(orders // 20 + 1)]
+    today = date.today()
+    with database.get_db() as conn:
+        batch = []
+        for n in range(orders):
+            order_date = today - timedelta(days=730 * (orders - n) // max(orders, 1))
+            batch.append((
+                f"#ORD{100000 + n}",
+                rng.choice(customers),
+                order_date.strftime("%d %b %Y"),
+                rng.choice(STATUSES),
+                round(rng.uniform(5, 2000), 2),
+                rng.choice(PAYMENT_STATUSES),
+            ))
+            if len(batch) == INSERT_BATCH or n == orders - 1:
+                conn.executemany("""
+                    INSERT INTO orders (order_number, customer_name, order_date, status, total_amount, payment_status)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, batch)
+                batch = []
+        for start in range(0, items, INSERT_BATCH):
+            conn.executemany(
+                "INSERT INTO items (name) VALUES (?)",
+                [(f"Item {n}",) for n in range(start, min(start + INSERT_BATCH, items))],
+            )
+    if archive:
+        from app.archive import compact_orders
+        return compact_orders()
+    return None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(path, env=None, workers=1):
+    """
+    Run the app under uvicorn against the database at `path` and yield
+    (host, port) once /health answers. Extra environment variables (e.g.
+    ADMISSION_CONTROL_ENABLED=0) are passed through to the server.
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_PATH": os.path.abspath(path), **(env or {})},
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                status, _ = request(http.client.HTTPConnection("127.0.0.1", port, timeout=5), "GET", "/health")
+                if status == 200:
+                    break
+            except OSError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("Server failed to start")
+            time.sleep(0.2)
+        yield "127.0.0.1", port
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def request(conn, method, path, body=None):
+    """Send one request on a keep-alive http.client connection; return (status, raw body)."""
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a synthetic benchmark database")
+    parser.add_argument("--orders", type=int, default=1000000, help="Synthetic orders to generate")
+    parser.add_argument("--items", type=int, default=1000000, help="Synthetic items to generate")
+    parser.add_argument("--archive", action="store_true", help="Compact cold orders into the archive")
+    parser.add_argument("--database", default="bench.db", help="Database file to create (replaced if it exists)")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = build_database(args.database, args.orders, args.items, args.archive)
+    print(f"Built {args.orders} orders and {args.items} items in {time.perf_counter() - start:.1f}s")
+    if result:
+        print(f"Archived {result['archived']} orders")
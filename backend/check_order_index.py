@@ -0,0 +1,159 @@
+"""
+Order Index Consistency Check
+
+Builds a synthetic database (cold orders archived), starts the in-memory
+order index and applies a randomized mix of writes through the route handlers:
+creates, updates, deletes, bulk status / duplicate / delete, archive
+compaction and restores. Every few writes it compares list_orders and stats
+answered by the index against the same queries run in SQL, for every status
+filter, sort field, direction and a spread of pages. The overlay is kept small
+so merges into the base arrays are exercised as well as overlay reads.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("ORDER_INDEX_ENABLED", "1")
+# Small overlay, so a run crosses many merges
+os.environ.setdefault("ORDER_INDEX_DELTA_LIMIT", "50")
+
+from fastapi import HTTPException
+
+from app import database
+from app.archive import compact_orders, orders_source
+from app.order_index import order_index
+from app.routes import orders
+from benchmark_data import PAYMENT_STATUSES, STATUSES, build_database
+
+STATUS_FILTERS = [None, "Pending", "Completed", "Refunded", "Cancelled"]
+
+PAGE_LIMIT = 20
+
+COLUMNS = "id, order_number, customer_name, order_date, status, total_amount, payment_status"
+
+
+def sql_page(conn, status, sort_by, sort_order, offset):
+    """The expected answer: SQL over hot and archived orders, ties broken by id like the index."""
+    where = " WHERE status = ?" if status else ""
+    params = [status] if status else []
+    source = f"{orders_source(conn)}{where}"
+    total = conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+    rows = conn.execute(
+        f"SELECT {COLUMNS} FROM {source} ORDER BY {sort_by} {sort_order}, id {sort_order} LIMIT ? OFFSET ?",
+        params + [PAGE_LIMIT, offset],
+    ).fetchall()
+    return total, [orders.row_to_order(row) for row in rows]
+
+
+def sql_stats(conn):
+    source = orders_source(conn)
+    counts = dict(conn.execute(f"SELECT status, COUNT(*) FROM {source} GROUP BY status").fetchall())
+    return {"total": sum(counts.values()), **counts}
+
+
+def compare(label):
+    """Compare every filter/sort/page against SQL; return the number of mismatches."""
+    mismatches = 0
+    with database.get_db() as conn:
+        stats = order_index.stats()
+        expected = sql_stats(conn)
+        if {key: value for key, value in (stats or {}).items() if value} != expected:
+            print(f"[{label}] stats: index {stats} vs SQL {expected}")
+            mismatches += 1
+        for status in STATUS_FILTERS:
+            total = expected.get(status, 0) if status else expected["total"]
+            last_page = max(total - PAGE_LIMIT, 0)
+            for sort_by in orders.ORDER_SORT_FIELDS:
+                for sort_order in ("asc", "desc"):
+                    for offset in sorted({0, PAGE_LIMIT, last_page // 2, last_page, total}):
+                        answer = order_index.query(status, sort_by, sort_order, offset, PAGE_LIMIT)
+                        if answer is None:
+                            print(f"[{label}] index not ready")
+                            return mismatches + 1
+                        if answer != sql_page(conn, status, sort_by, sort_order, offset):
+                            print(f"[{label}] status={status} sort={sort_by} {sort_order} offset={offset} differs")
+                            mismatches += 1
+    return mismatches
+
+
+def random_order(rng, n):
+    return orders.OrderCreate(
+        order_number=f"#NEW{n}",
+        customer_name=rng.choice(["Zed Young", "amy adams", "Customer 7", "Élodie"]),
+        order_date=rng.choice(["01 Jan 2020", "15 Mar 2024", "2025-06-30"]),
+        status=rng.choice(STATUSES + ["Cancelled"]),
+        total_amount=round(rng.uniform(1, 500), 2),
+        payment_status=rng.choice(PAYMENT_STATUSES),
+    )
+
+
+def random_write(rng, n):
+    """Apply one random write through the route handlers."""
+    with database.get_db() as conn:
+        max_id = conn.execute(f"SELECT MAX(id) FROM {orders_source(conn)}").fetchone()[0] or 1
+    some_ids = lambda k: rng.sample(range(1, max_id + 1), min(k, max_id))
+    kind = rng.choice(["create", "create", "update", "update", "delete", "bulk_status", "bulk_duplicate", "bulk_delete", "compact"])
+    try:
+        if kind == "create":
+            orders.create_order(random_order(rng, n))
+        elif kind == "update":
+            fields = random_order(rng, n).dict()
+            update = {key: fields[key] for key in rng.sample(sorted(fields), rng.randint(1, 3))}
+            orders.update_order(rng.randint(1, max_id), orders.OrderUpdate(**update))
+        elif kind == "delete":
+            orders.delete_order(rng.randint(1, max_id))
+        elif kind == "bulk_status":
+            orders.bulk_update_status(orders.BulkStatusRequest(order_ids=some_ids(40), status=rng.choice(STATUSES)))
+        elif kind == "bulk_duplicate":
+            orders.bulk_duplicate_orders(orders.BulkIdsRequest(order_ids=some_ids(30)))
+        elif kind == "bulk_delete":
+            orders.bulk_delete_orders(orders.BulkIdsRequest(order_ids=some_ids(30)))
+        else:
+            compact_orders()
+    except HTTPException as e:
+        if e.status_code != 404:
+            raise
+    return kind
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory order index vs SQL consistency check")
+    parser.add_argument("--rows", type=int, default=5000, help="Synthetic orders to generate")
+    parser.add_argument("--writes", type=int, default=300, help="Random writes to apply")
+    parser.add_argument("--check-every", type=int, default=25, help="Writes between comparisons")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the writes")
+    parser.add_argument("--database", help="Where to build the synthetic database (default: a temporary file)")
+
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database or os.path.join(tmp, "order_index.db")
+        archived = build_database(path, args.rows, archive=True)
+        print(f"Built {args.rows} orders ({archived['archived']} archived)")
+
+        order_index.start()
+        deadline = time.monotonic() + 60
+        while not order_index.ready:
+            if time.monotonic() > deadline:
+                print("Order index did not become ready (is numpy installed?)")
+                sys.exit(1)
+            time.sleep(0.05)
+
+        failures = compare("initial")
+        kinds = {}
+        for n in range(1, args.writes + 1):
+            kind = random_write(rng, n)
+            kinds[kind] = kinds.get(kind, 0) + 1
+            if n % args.check_every == 0 or n == args.writes:
+                failures += compare(f"after {n} writes")
+        print("Writes applied: " + ", ".join(f"{kind} {count}" for kind, count in sorted(kinds.items())))
+
+    if failures:
+        print(f"{failures} mismatch(es) between the order index and SQL.")
+        sys.exit(1)
+    print("Order index matches SQL.")
@@ -0,0 +1,159 @@
+"""
+Query Plan Regression Check
+
+Builds a large synthetic database, captures EXPLAIN QUERY PLAN for every
+list_orders filter/sort combination and fails when a plan falls back to a
+full table scan or a temp B-tree sort where an index is expected. Each
+combination is also timed and compared against recorded latency baselines.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from app import database
+from app.routes.orders import ORDER_SORT_FIELDS, list_orders_queries
+from benchmark_data import build_database
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_plan_baselines.json")
+
+# Filter values to combine with every sort; Completed also pulls in the archive
+STATUS_FILTERS = [None, "Pending", "Completed"]
+SEARCH_FILTERS = [None, "ord1"]
+
+PAGE_LIMIT = 100
+
+
+def combinations():
+    for status in STATUS_FILTERS:
+        for search in SEARCH_FILTERS:
+            for sort_by in ORDER_SORT_FIELDS:
+                for sort_order in ("asc", "desc"):
+                    yield status, search, sort_by, sort_order
+
+
+def combination_name(status, search, sort_by, sort_order):
+    return f"status={status or '*'} search={search or '*'} sort={sort_by} {sort_order}"
+
+
+def explain(cursor, query, params):
+    cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def plan_problems(plan, status, sort_by, counting):
+    """
+    Return the plan lines that break expectations:
+    - a temp B-tree is never acceptable (the sort must come from an index)
+    - a status filter must be an index SEARCH or an index walk, never a table SCAN
+    - without a status filter, a bare table SCAN is only fine when it walks
+      rowid order (sort by id) or counts every row
+    """
+    problems = []
+    for line in plan:
+        if "USE TEMP B-TREE" in line:
+            problems.append(line)
+        elif line.startswith("SCAN orders") and "INDEX" not in line:
+            if status or not (counting or sort_by == "id"):
+                problems.append(line)
+    return problems
+
+
+def time_combination(cursor, count_query, count_params, query, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(count_query, count_params)
+        cursor.fetchone()
+        cursor.execute(query, params + [PAGE_LIMIT, 0])
+        cursor.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_checks(rows, repeat, baselines_path, update_baselines, max_slowdown):
+    """Check every combination; return the number of failures."""
+    baselines = load_baselines(baselines_path)
+    if baselines is not None and baselines.get("rows") != rows:
+        print(f"Baselines were recorded with {baselines.get('rows')} rows, not {rows}; skipping latency comparison.")
+        baselines = None
+
+    failures = 0
+    latencies = {}
+    with database.get_db() as conn:
+        cursor = conn.cursor()
+        print("-" * 60)
+        for status, search, sort_by, sort_order in combinations():
+            name = combination_name(status, search, sort_by, sort_order)
+            count_query, count_params, query, params = list_orders_queries(conn, status, search, sort_by, sort_order)
+
+            problems = (
+                plan_problems(explain(cursor, count_query, count_params), status, sort_by, counting=True)
+                + plan_problems(explain(cursor, query, params + [PAGE_LIMIT, 0]), status, sort_by, counting=False)
+            )
+            latency = time_combination(cursor, count_query, count_params, query, params, repeat)
+            latencies[name] = round(latency, 3)
+
+            result = "OK"
+            if problems:
+                result = "PLAN: " + "; ".join(problems)
+            elif baselines is not None and name in baselines["latency_ms"]:
+                baseline = baselines["latency_ms"][name]
+                # Small absolute differences are timer noise, not regressions
+                if max_slowdown and latency > baseline * max_slowdown and latency - baseline > 1.0:
+                    result = f"SLOW: {latency:.2f}ms vs baseline {baseline:.2f}ms"
+            if result != "OK":
+                failures += 1
+            print(f"[{'PASS' if result == 'OK' else 'FAIL'}] {name:<55} {latency:8.2f}ms  {result if result != 'OK' else ''}")
+        print("-" * 60)
+
+    if update_baselines:
+        with open(baselines_path, "w") as f:
+            json.dump({"rows": rows, "latency_ms": latencies}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Latency baselines written to {baselines_path}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="list_orders query plan regression check")
+    parser.add_argument("--rows", type=int, default=200000, help="Synthetic orders to generate")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per combination (median is kept)")
+    parser.add_argument("--baselines", default=BASELINES_PATH, help="Latency baselines file")
+    parser.add_argument("--update-baselines", action="store_true", help="Record this run's latencies as the new baselines")
+    parser.add_argument(
+        "--max-slowdown", type=float, default=3.0,
+        help="Fail when a combination is this many times slower than its baseline (0 to only report)"
+    )
+    parser.add_argument("--analyze", action="store_true", help="Run ANALYZE before checking plans")
+    parser.add_argument("--database", help="Where to build the synthetic database (default: a temporary file)")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database or os.path.join(tmp, "query_plans.db")
+        start = time.perf_counter()
+        # Cold orders are archived so the UNION ALL path is exercised
+        archived = build_database(path, args.rows, archive=True)
+        if args.analyze:
+            # Planner statistics as the maintenance service's ANALYZE leaves them
+            with database.get_db() as conn:
+                conn.execute("ANALYZE")
+        print(f"Built {args.rows} orders ({archived['archived']} archived) in {time.perf_counter() - start:.1f}s")
+        failures = run_checks(args.rows, args.repeat, args.baselines, args.update_baselines, args.max_slowdown)
+
+    if failures:
+        print(f"{failures} combination(s) failed.")
+        sys.exit(1)
+    print("All combinations passed.")
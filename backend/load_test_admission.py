@@ -0,0 +1,233 @@
+"""
+Admission Control Load Test
+
+Runs uvicorn on a large synthetic database (default 1M orders and 1M items)
+and measures interactive latency - GET /orders/{id} and POST
+/orders/batch-get - three times: idle, under bulk load with admission
+control on, and under the same load with it off. Bulk load is clients
+submitting /orders/bulk/duplicate jobs (waiting on /jobs/{id}) and clients
+streaming the full GET /items listing.
+
+The goal is that interactive p99 stays flat while bulk work runs: the run
+fails when p99 under load with admission control on exceeds --max-p99-ratio
+times the idle p99.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from benchmark_data import build_database, request, serve
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class Recorder:
+    """Thread-safe latency samples (ms) and status counts per label."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+
+    def add(self, label, status, elapsed_ms=None):
+        with self._lock:
+            if elapsed_ms is not None:
+                self.samples.setdefault(label, []).append(elapsed_ms)
+            counts = self.statuses.setdefault(label, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.samples = {}
+            self.statuses = {}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def connect(host, port):
+    return http.client.HTTPConnection(host, port, timeout=120)
+
+
+def backoff(response_headers, stop):
+    """Honour a 503's Retry-After, waking early when the phase ends."""
+    stop.wait(float(response_headers.get("Retry-After", "1")))
+
+
+def interactive_client(host, port, rows, label, think, stop, recorder, seed):
+    """Single-order GETs, or 100-id batch-gets, with `think` seconds between requests."""
+    rng = random.Random(seed)
+    conn = connect(host, port)
+    while not stop.is_set():
+        if label == "GET /orders/{id}":
+            method, path, body = "GET", f"/orders/{rng.randint(1, rows)}", None
+        else:
+            method, path, body = "POST", "/orders/batch-get", {"ids": rng.sample(range(1, rows + 1), 100)}
+        start = time.perf_counter()
+        try:
+            status, _ = request(conn, method, path, body)
+        except OSError:
+            recorder.add(label, "error")
+            conn = connect(host, port)
+            continue
+        recorder.add(label, status, (time.perf_counter() - start) * 1000 if status == 200 else None)
+        stop.wait(think)
+
+
+def duplicate_client(host, port, rows, bulk_ids, stop, recorder, seed):
+    """Submit a bulk duplicate job, wait for it to finish, repeat."""
+    rng = random.Random(seed)
+    conn = connect(host, port)
+    while not stop.is_set():
+        try:
+            conn.request(
+                "POST", "/orders/bulk/duplicate",
+                body=json.dumps({"order_ids": rng.sample(range(1, rows + 1), bulk_ids)}),
+                headers={"Content-Type": "application/json"},
+            )
+            response = conn.getresponse()
+            body = response.read()
+            recorder.add("bulk duplicate", response.status)
+            if response.status == 503:
+                backoff(response.headers, stop)
+            elif response.status == 202:
+                job_id = json.loads(body)["id"]
+                while not stop.wait(0.5):
+                    status, job = request(conn, "GET", f"/jobs/{job_id}")
+                    if status == 200 and json.loads(job)["status"] in FINISHED_STATUSES:
+                        break
+                else:
+                    # Jobs resume when the server restarts; don't carry this one into the next phase
+                    request(conn, "POST", f"/jobs/{job_id}/cancel")
+        except OSError:
+            # The server drops keep-alive connections left idle through a backoff
+            conn = connect(host, port)
+
+
+def items_client(host, port, stop, recorder):
+    """Stream the whole unpaginated GET /items listing, repeat."""
+    conn = connect(host, port)
+    while not stop.is_set():
+        try:
+            conn.request("GET", "/items")
+            response = conn.getresponse()
+            if response.status == 503:
+                response.read()
+                recorder.add("GET /items (full)", 503)
+                backoff(response.headers, stop)
+                continue
+            # Read it through even when the phase ends, so the connection stays usable
+            while response.read(65536):
+                pass
+            recorder.add("GET /items (full)", response.status)
+        except OSError:
+            conn = connect(host, port)
+
+
+def run_phase(path, args, admission, bulk):
+    """Run one phase against a fresh server; return its Recorder."""
+    recorder = Recorder()
+    stop = threading.Event()
+    env = {"ADMISSION_CONTROL_ENABLED": "1" if admission else "0"}
+    think = args.think_ms / 1000
+    with serve(path, env) as (host, port):
+        threads = [
+            threading.Thread(target=interactive_client, args=(host, port, args.rows, "GET /orders/{id}", think, stop, recorder, n))
+            for n in range(args.interactive_clients)
+        ] + [
+            threading.Thread(target=interactive_client, args=(host, port, args.rows, "POST /orders/batch-get", think, stop, recorder, 100 + n))
+            for n in range(args.batch_get_clients)
+        ]
+        if bulk:
+            threads += [
+                threading.Thread(target=duplicate_client, args=(host, port, args.rows, args.bulk_ids, stop, recorder, 200 + n))
+                for n in range(args.bulk_clients)
+            ] + [
+                threading.Thread(target=items_client, args=(host, port, stop, recorder))
+                for _ in range(args.stream_clients)
+            ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        # Startup work (index builds, the first bulk jobs queueing) isn't part of the measurement
+        stop.wait(args.warmup)
+        recorder.reset()
+        stop.wait(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=120)
+    return recorder
+
+
+def report(phases):
+    """Print latency per interactive route and outcome counts per phase."""
+    print("-" * 78)
+    print(f"{'phase':<24} {'route':<24} {'requests':>8} {'p50':>9} {'p99':>9} {'max':>9}")
+    for phase, recorder in phases.items():
+        for label, samples in sorted(recorder.samples.items()):
+            print(
+                f"{phase:<24} {label:<24} {len(samples):>8} {statistics.median(samples):7.1f}ms "
+                f"{percentile(samples, 0.99):7.1f}ms {max(samples):7.1f}ms"
+            )
+        for label, counts in sorted(recorder.statuses.items()):
+            if label not in recorder.samples or set(counts) != {200}:
+                print(f"{phase:<24} {label:<24} " + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items(), key=str)))
+    print("-" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interactive latency under bulk load, with and without admission control")
+    parser.add_argument("--rows", type=int, default=1000000, help="Synthetic orders and items to generate")
+    parser.add_argument("--seconds", type=float, default=20, help="Length of each phase")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of each phase discarded before measuring")
+    parser.add_argument("--interactive-clients", type=int, default=8, help="Clients sending GET /orders/{id}")
+    parser.add_argument("--batch-get-clients", type=int, default=2, help="Clients sending 100-id POST /orders/batch-get")
+    parser.add_argument(
+        "--think-ms", type=float, default=100,
+        help="Pause between an interactive client's requests, so the idle run doesn't saturate the server"
+    )
+    parser.add_argument("--bulk-clients", type=int, default=6, help="Clients submitting bulk duplicate jobs")
+    parser.add_argument("--bulk-ids", type=int, default=20000, help="Ids per bulk duplicate")
+    parser.add_argument("--stream-clients", type=int, default=6, help="Clients streaming the full GET /items listing")
+    parser.add_argument(
+        "--max-p99-ratio", type=float, default=3.0,
+        help="Fail when loaded p99 with admission control is this many times the idle p99 (0 to only report)"
+    )
+    parser.add_argument("--database", help="Where to build the synthetic database (default: a temporary file)")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database or os.path.join(tmp, "admission.db")
+        start = time.perf_counter()
+        build_database(path, args.rows, args.rows)
+        print(f"Built {args.rows} orders and items in {time.perf_counter() - start:.1f}s")
+        phases = {
+            "idle": run_phase(path, args, admission=True, bulk=False),
+            "bulk, admission on": run_phase(path, args, admission=True, bulk=True),
+            "bulk, admission off": run_phase(path, args, admission=False, bulk=True),
+        }
+    report(phases)
+
+    failures = 0
+    idle, loaded = phases["idle"].samples, phases["bulk, admission on"].samples
+    for label in sorted(idle):
+        ratio = percentile(loaded.get(label, [0]), 0.99) / percentile(idle[label], 0.99)
+        flat = not args.max_p99_ratio or ratio <= args.max_p99_ratio
+        failures += not flat
+        print(f"[{'PASS' if flat else 'FAIL'}] {label}: p99 under bulk load is {ratio:.1f}x idle")
+
+    if failures:
+        print(f"Interactive p99 is not flat under bulk load (limit {args.max_p99_ratio}x).")
+        sys.exit(1)
+    print("Interactive p99 stays flat under bulk load.")
@@ -0,0 +1,73 @@
+"""
+Migration: Create orders archive table
+Version: 004
+Description: Creates the orders_archive table that holds cold Completed/Refunded
+orders, those dated before the hot months
+"""
+
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_PATH
+
+
+def upgrade():
+    """Apply the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+    
+    # Check if this migration has already been applied
+    cursor.execute("SELECT 1 FROM _migrations WHERE name = ?", ("004_create_orders_archive_table",))
+    if cursor.fetchone():
+        print("Migration 004_create_orders_archive_table already applied. Skipping.")
+        conn.close()
+        return
+    
+    # Create archive table (ids are kept from the orders table, so no AUTOINCREMENT)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS orders_archive (
+            id INTEGER PRIMARY KEY,
+            order_number TEXT NOT NULL,
+            customer_name TEXT NOT NULL,
+            order_date TEXT NOT NULL,
+            status TEXT NOT NULL,
+            total_amount REAL NOT NULL,
+            payment_status TEXT NOT NULL
+        )
+    """)
+    
+    # Record this migration
+    cursor.execute("INSERT INTO _migrations (name) VALUES (?)", ("004_create_orders_archive_table",))
+    
+    conn.commit()
+    conn.close()
+    print("Migration 004_create_orders_archive_table applied successfully.")
+
+
+def downgrade():
+    """Revert the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+    
+    # Move archived orders back into the orders table before dropping the archive
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'orders_archive'")
+    if cursor.fetchone():
+        cursor.execute("""
+            INSERT OR IGNORE INTO orders (id, order_number, customer_name, order_date, status, total_amount, payment_status)
+            SELECT id, order_number, customer_name, order_date, status, total_amount, payment_status
+            FROM orders_archive
+        """)
+    
+    # Drop archive table
+    cursor.execute("DROP TABLE IF EXISTS orders_archive")
+    
+    # Remove migration record
+    cursor.execute("DELETE FROM _migrations WHERE name = ?", ("004_create_orders_archive_table",))
+    
+    conn.commit()
+    conn.close()
+    print("Migration 004_create_orders_archive_table reverted successfully.")
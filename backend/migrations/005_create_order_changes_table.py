@@ -0,0 +1,62 @@
+"""
+Migration: Create order changes table
+Version: 005
+Description: Creates the order_changes log that every order mutation writes to,
+used by the change feed and SSE stream
+"""
+
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_PATH
+
+
+def upgrade():
+    """Apply the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+    
+    # Check if this migration has already been applied
+    cursor.execute("SELECT 1 FROM _migrations WHERE name = ?", ("005_create_order_changes_table",))
+    if cursor.fetchone():
+        print("Migration 005_create_order_changes_table already applied. Skipping.")
+        conn.close()
+        return
+    
+    # Create change log table (seq is the cursor clients resume from)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS order_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            payload TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Record this migration
+    cursor.execute("INSERT INTO _migrations (name) VALUES (?)", ("005_create_order_changes_table",))
+    
+    conn.commit()
+    conn.close()
+    print("Migration 005_create_order_changes_table applied successfully.")
+
+
+def downgrade():
+    """Revert the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+    
+    # Drop change log table
+    cursor.execute("DROP TABLE IF EXISTS order_changes")
+    
+    # Remove migration record
+    cursor.execute("DELETE FROM _migrations WHERE name = ?", ("005_create_order_changes_table",))
+    
+    conn.commit()
+    conn.close()
+    print("Migration 005_create_order_changes_table reverted successfully.")
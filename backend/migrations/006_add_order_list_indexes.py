@@ -0,0 +1,74 @@
+"""
+Migration: Add order list indexes
+Version: 006
+Description: Adds the indexes list_orders needs: status for filtered id-order
+pages and counts, and one index per sortable column so a sort is an ordered
+index walk instead of a full scan plus temp B-tree sort. The archive gets the
+same set, so the UNION ALL with it merges both sides in index order and a
+page reads about as many archived rows as it returns. Status is deliberately
+not part of the sort indexes, so a status change only rewrites one index
+entry per order.
+"""
+
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_PATH
+
+# Sortable columns besides id (id order comes from the rowid)
+SORT_COLUMNS = ["order_number", "order_date", "total_amount", "payment_status", "customer_name"]
+
+
+def index_definitions():
+    """Return (index name, table, columns) for every list index."""
+    definitions = []
+    for table in ("orders", "orders_archive"):
+        # Status filter with id order (rows within one status are in rowid order)
+        definitions.append((f"idx_{table}_status", table, "status"))
+        for column in SORT_COLUMNS:
+            # Sort, walked in order; a status filter is checked along the walk
+            definitions.append((f"idx_{table}_{column}", table, column))
+    return definitions
+
+
+def upgrade():
+    """Apply the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    # Check if this migration has already been applied
+    cursor.execute("SELECT 1 FROM _migrations WHERE name = ?", ("006_add_order_list_indexes",))
+    if cursor.fetchone():
+        print("Migration 006_add_order_list_indexes already applied. Skipping.")
+        conn.close()
+        return
+
+    for name, table, columns in index_definitions():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+    # Record this migration
+    cursor.execute("INSERT INTO _migrations (name) VALUES (?)", ("006_add_order_list_indexes",))
+
+    conn.commit()
+    conn.close()
+    print("Migration 006_add_order_list_indexes applied successfully.")
+
+
+def downgrade():
+    """Revert the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    for name, _, _ in index_definitions():
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+    # Remove migration record
+    cursor.execute("DELETE FROM _migrations WHERE name = ?", ("006_add_order_list_indexes",))
+
+    conn.commit()
+    conn.close()
+    print("Migration 006_add_order_list_indexes reverted successfully.")
@@ -0,0 +1,76 @@
+"""
+Migration: Create jobs table
+Version: 007
+Description: Creates the jobs table backing the background job worker that
+runs large bulk order operations in chunks
+"""
+
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_PATH
+
+
+def upgrade():
+    """Apply the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    # Check if this migration has already been applied
+    cursor.execute("SELECT 1 FROM _migrations WHERE name = ?", ("007_create_jobs_table",))
+    if cursor.fetchone():
+        print("Migration 007_create_jobs_table already applied. Skipping.")
+        conn.close()
+        return
+
+    # Create jobs table (processed is the resume offset into params' ids)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            total INTEGER NOT NULL,
+            processed INTEGER NOT NULL DEFAULT 0,
+            affected INTEGER NOT NULL DEFAULT 0,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            message TEXT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+
+    # Worker picks up the oldest queued job
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_status
+        ON jobs (status, id)
+    """)
+
+    # Record this migration
+    cursor.execute("INSERT INTO _migrations (name) VALUES (?)", ("007_create_jobs_table",))
+
+    conn.commit()
+    conn.close()
+    print("Migration 007_create_jobs_table applied successfully.")
+
+
+def downgrade():
+    """Revert the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    # Drop jobs table
+    cursor.execute("DROP TABLE IF EXISTS jobs")
+
+    # Remove migration record
+    cursor.execute("DELETE FROM _migrations WHERE name = ?", ("007_create_jobs_table",))
+
+    conn.commit()
+    conn.close()
+    print("Migration 007_create_jobs_table reverted successfully.")
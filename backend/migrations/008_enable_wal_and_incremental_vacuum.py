@@ -0,0 +1,60 @@
+"""
+Migration: Enable WAL and incremental auto-vacuum
+Version: 008
+Description: Switches the database to write-ahead logging (readers no longer
+block writers, and checkpoints can be scheduled) and to incremental
+auto-vacuum so the maintenance service can return free pages to the OS.
+Changing auto_vacuum on an existing database needs a full VACUUM, so this
+migration rewrites the file once.
+"""
+
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_PATH
+
+
+def upgrade():
+    """Apply the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    # Check if this migration has already been applied
+    cursor.execute("SELECT 1 FROM _migrations WHERE name = ?", ("008_enable_wal_and_incremental_vacuum",))
+    if cursor.fetchone():
+        print("Migration 008_enable_wal_and_incremental_vacuum already applied. Skipping.")
+        conn.close()
+        return
+
+    # Neither setting can change inside a transaction
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    cursor.execute("VACUUM")
+    cursor.execute("PRAGMA journal_mode = WAL")
+
+    # Record this migration
+    cursor.execute("INSERT INTO _migrations (name) VALUES (?)", ("008_enable_wal_and_incremental_vacuum",))
+
+    conn.commit()
+    conn.close()
+    print("Migration 008_enable_wal_and_incremental_vacuum applied successfully.")
+
+
+def downgrade():
+    """Revert the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute("PRAGMA journal_mode = DELETE")
+    cursor.execute("PRAGMA auto_vacuum = NONE")
+    cursor.execute("VACUUM")
+
+    # Remove migration record
+    cursor.execute("DELETE FROM _migrations WHERE name = ?", ("008_enable_wal_and_incremental_vacuum",))
+
+    conn.commit()
+    conn.close()
+    print("Migration 008_enable_wal_and_incremental_vacuum reverted successfully.")
@@ -0,0 +1,92 @@
+"""
+Migration: Create orders archive counts
+Version: 009
+Description: Creates orders_archive_counts, the number of archived orders per
+status, kept exact by triggers on orders_archive. Order counts and stats add
+these to a count of the hot table instead of counting the archive each time.
+"""
+
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_PATH
+
+
+def upgrade():
+    """Apply the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    # Check if this migration has already been applied
+    cursor.execute("SELECT 1 FROM _migrations WHERE name = ?", ("009_create_orders_archive_counts",))
+    if cursor.fetchone():
+        print("Migration 009_create_orders_archive_counts already applied. Skipping.")
+        conn.close()
+        return
+
+    # Create counts table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS orders_archive_counts (
+            status TEXT PRIMARY KEY,
+            orders INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    # Count what is already archived
+    cursor.execute("""
+        INSERT OR REPLACE INTO orders_archive_counts (status, orders)
+        SELECT status, COUNT(*) FROM orders_archive GROUP BY status
+    """)
+
+    # Keep the counts in step with every insert, delete and status change
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS orders_archive_counts_insert AFTER INSERT ON orders_archive
+        BEGIN
+            INSERT OR IGNORE INTO orders_archive_counts (status) VALUES (NEW.status);
+            UPDATE orders_archive_counts SET orders = orders + 1 WHERE status = NEW.status;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS orders_archive_counts_delete AFTER DELETE ON orders_archive
+        BEGIN
+            UPDATE orders_archive_counts SET orders = orders - 1 WHERE status = OLD.status;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS orders_archive_counts_update AFTER UPDATE OF status ON orders_archive
+        BEGIN
+            UPDATE orders_archive_counts SET orders = orders - 1 WHERE status = OLD.status;
+            INSERT OR IGNORE INTO orders_archive_counts (status) VALUES (NEW.status);
+            UPDATE orders_archive_counts SET orders = orders + 1 WHERE status = NEW.status;
+        END
+    """)
+
+    # Record this migration
+    cursor.execute("INSERT INTO _migrations (name) VALUES (?)", ("009_create_orders_archive_counts",))
+
+    conn.commit()
+    conn.close()
+    print("Migration 009_create_orders_archive_counts applied successfully.")
+
+
+def downgrade():
+    """Revert the migration."""
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    # Drop triggers and counts table
+    cursor.execute("DROP TRIGGER IF EXISTS orders_archive_counts_insert")
+    cursor.execute("DROP TRIGGER IF EXISTS orders_archive_counts_delete")
+    cursor.execute("DROP TRIGGER IF EXISTS orders_archive_counts_update")
+    cursor.execute("DROP TABLE IF EXISTS orders_archive_counts")
+
+    # Remove migration record
+    cursor.execute("DELETE FROM _migrations WHERE name = ?", ("009_create_orders_archive_counts",))
+
+    conn.commit()
+    conn.close()
+    print("Migration 009_create_orders_archive_counts reverted successfully.")